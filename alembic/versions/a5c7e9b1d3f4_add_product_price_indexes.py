@@ -0,0 +1,43 @@
+"""Add partial price indexes for sorted listings and facets
+
+Revision ID: a5c7e9b1d3f4
+Revises: f2a8d4e6b9c3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c7e9b1d3f4'
+down_revision: Union[str, None] = 'f2a8d4e6b9c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Price-sorted / price-filtered listing within a category, and index-only
+    # scans of (category_id, price) for facet counts
+    op.create_index(
+        'idx_products_active_category_price',
+        'products',
+        ['category_id', 'price', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_active')
+    )
+    # Price-sorted listing across the whole catalog
+    op.create_index(
+        'idx_products_active_price',
+        'products',
+        ['price', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_products_active_price', table_name='products')
+    op.drop_index('idx_products_active_category_price', table_name='products')
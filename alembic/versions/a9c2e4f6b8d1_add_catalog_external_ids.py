@@ -0,0 +1,35 @@
+"""Add external ids to products and categories for catalog imports
+
+Revision ID: a9c2e4f6b8d1
+Revises: d3f5b7c9e1a4
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c2e4f6b8d1'
+down_revision: Union[str, None] = 'd3f5b7c9e1a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Key of the row in the supplier feed (app.catalog_import upserts by it).
+    # NULL for rows created by hand. Not served by the API, so it stays out of
+    # the catalog_version trigger column list of products
+    op.add_column('categories', sa.Column('external_id', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_categories_external_id'), 'categories', ['external_id'], unique=True)
+    op.add_column('products', sa.Column('external_id', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_products_external_id'), 'products', ['external_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_products_external_id'), table_name='products')
+    op.drop_column('products', 'external_id')
+    op.drop_index(op.f('ix_categories_external_id'), table_name='categories')
+    op.drop_column('categories', 'external_id')
@@ -0,0 +1,52 @@
+"""Add catalog_version counter maintained by triggers
+
+Revision ID: b3d91e4a6c20
+Revises: 7f8a2c9d1e5b
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d91e4a6c20'
+down_revision: Union[str, None] = '7f8a2c9d1e5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO catalog_version (id, version) VALUES (1, 1)")
+
+    # Statement-level triggers: any edit of the catalog (API, seed scripts, psql)
+    # bumps the version once per statement
+    op.execute("""
+        CREATE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('products', 'categories'):
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()
+        """)
+
+
+def downgrade() -> None:
+    for table in ('products', 'categories'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_catalog_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_catalog_version()")
+    op.drop_table('catalog_version')
@@ -0,0 +1,32 @@
+"""Index orders by creation time for exports
+
+Revision ID: b4d6f8a0c2e5
+Revises: a9c2e4f6b8d1
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d6f8a0c2e5'
+down_revision: Union[str, None] = 'a9c2e4f6b8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Order exports read a date range of all users in (created_at, id) order
+    op.create_index(
+        'idx_orders_created',
+        'orders',
+        ['created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_orders_created', table_name='orders')
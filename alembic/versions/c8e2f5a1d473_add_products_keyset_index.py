@@ -0,0 +1,33 @@
+"""Add composite index for keyset pagination of products
+
+Revision ID: c8e2f5a1d473
+Revises: b3d91e4a6c20
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2f5a1d473'
+down_revision: Union[str, None] = 'b3d91e4a6c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches ORDER BY sort_order, name, id after the category/is_active filter,
+    # so every page (even deep ones) is an index range scan
+    op.create_index(
+        'idx_products_category_active_order',
+        'products',
+        ['category_id', 'is_active', 'sort_order', 'name', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_products_category_active_order', table_name='products')
@@ -0,0 +1,78 @@
+"""Add product stock with restore on order cancellation
+
+Revision ID: d3f5b7c9e1a4
+Revises: c1e3a5b7d9f2
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f5b7c9e1a4'
+down_revision: Union[str, None] = 'c1e3a5b7d9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every products column except stock: checkout decrements stock on each order,
+# which must not drop the catalog caches of all workers
+CATALOG_COLUMNS = "id, name, description, price, images, category_id, is_active, sort_order"
+
+
+def upgrade() -> None:
+    # NULL = stock is not tracked for the product (unlimited)
+    op.add_column('products', sa.Column('stock', sa.Integer(), nullable=True))
+    op.create_check_constraint('ck_products_stock_non_negative', 'products', 'stock >= 0')
+
+    op.execute("DROP TRIGGER trg_products_catalog_version ON products")
+    op.execute(f"""
+        CREATE TRIGGER trg_products_catalog_version
+        AFTER INSERT OR UPDATE OF {CATALOG_COLUMNS} OR DELETE OR TRUNCATE ON products
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()
+    """)
+
+    # Cancelling an order (from the API or by hand) returns its items to stock;
+    # reopening takes them again and fails on the check constraint if sold out
+    op.execute("""
+        CREATE FUNCTION orders_restock_on_cancel() RETURNS trigger AS $$
+        DECLARE
+            direction integer := CASE WHEN NEW.status = 'cancelled' THEN 1 ELSE -1 END;
+        BEGIN
+            UPDATE products p
+            SET stock = p.stock + direction * i.quantity
+            FROM (
+                SELECT product_id, sum(quantity) AS quantity
+                FROM order_items
+                WHERE order_id = NEW.id
+                GROUP BY product_id
+            ) i
+            WHERE p.id = i.product_id AND p.stock IS NOT NULL;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_restock_on_cancel
+        AFTER UPDATE OF status ON orders
+        FOR EACH ROW
+        WHEN ((OLD.status = 'cancelled') IS DISTINCT FROM (NEW.status = 'cancelled'))
+        EXECUTE FUNCTION orders_restock_on_cancel()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS orders_restock_on_cancel ON orders")
+    op.execute("DROP FUNCTION IF EXISTS orders_restock_on_cancel()")
+
+    op.execute("DROP TRIGGER trg_products_catalog_version ON products")
+    op.execute("""
+        CREATE TRIGGER trg_products_catalog_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON products
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()
+    """)
+
+    op.drop_constraint('ck_products_stock_non_negative', 'products', type_='check')
+    op.drop_column('products', 'stock')
@@ -0,0 +1,36 @@
+"""Add indexes for keyset pagination of user orders and their items
+
+Revision ID: d4a7b2c9e615
+Revises: c8e2f5a1d473
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7b2c9e615'
+down_revision: Union[str, None] = 'c8e2f5a1d473'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Scanned backwards for ORDER BY created_at DESC, id DESC per user
+    op.create_index(
+        'idx_orders_user_created',
+        'orders',
+        ['user_id', 'created_at', 'id'],
+        unique=False
+    )
+    # Items are always read by order: selectinload(Order.items) and the
+    # items_count subquery of order history summaries
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('idx_orders_user_created', table_name='orders')
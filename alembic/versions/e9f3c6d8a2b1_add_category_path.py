@@ -0,0 +1,91 @@
+"""Add materialized path to categories
+
+Revision ID: e9f3c6d8a2b1
+Revises: d4a7b2c9e615
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9f3c6d8a2b1'
+down_revision: Union[str, None] = 'd4a7b2c9e615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # path = '/<root id>/.../<own id>/'; a subtree is every path LIKE '<path>%'
+    op.add_column('categories', sa.Column('path', sa.Text(), nullable=False, server_default=''))
+
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT id, '/' || id || '/' AS path
+            FROM categories
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, t.path || c.id || '/'
+            FROM categories c
+            JOIN tree t ON c.parent_id = t.id
+        )
+        UPDATE categories c SET path = tree.path
+        FROM tree
+        WHERE c.id = tree.id
+    """)
+
+    # Keep path in sync on insert and re-parenting, whoever edits the table
+    op.execute("""
+        CREATE FUNCTION categories_set_path() RETURNS trigger AS $$
+        DECLARE
+            parent_path text;
+        BEGIN
+            IF NEW.parent_id IS NULL THEN
+                NEW.path := '/' || NEW.id || '/';
+            ELSE
+                SELECT path INTO parent_path FROM categories WHERE id = NEW.parent_id;
+                IF parent_path LIKE '%/' || NEW.id || '/%' THEN
+                    RAISE EXCEPTION 'Category % cannot be moved under its own descendant', NEW.id;
+                END IF;
+                NEW.path := parent_path || NEW.id || '/';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION categories_move_subtree() RETURNS trigger AS $$
+        BEGIN
+            UPDATE categories
+            SET path = NEW.path || substr(path, length(OLD.path) + 1)
+            WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_categories_set_path
+        BEFORE INSERT OR UPDATE OF parent_id ON categories
+        FOR EACH ROW EXECUTE FUNCTION categories_set_path()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_categories_move_subtree
+        AFTER UPDATE OF parent_id ON categories
+        FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path)
+        EXECUTE FUNCTION categories_move_subtree()
+    """)
+
+    # text_pattern_ops lets LIKE 'prefix%' use the index regardless of collation
+    op.execute("CREATE INDEX idx_categories_path ON categories (path text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('idx_categories_path', table_name='categories')
+    op.execute("DROP TRIGGER IF EXISTS trg_categories_move_subtree ON categories")
+    op.execute("DROP TRIGGER IF EXISTS trg_categories_set_path ON categories")
+    op.execute("DROP FUNCTION IF EXISTS categories_move_subtree()")
+    op.execute("DROP FUNCTION IF EXISTS categories_set_path()")
+    op.drop_column('categories', 'path')
@@ -0,0 +1,58 @@
+"""Add full-text and trigram search on products
+
+Revision ID: f2a8d4e6b9c3
+Revises: e9f3c6d8a2b1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8d4e6b9c3'
+down_revision: Union[str, None] = 'e9f3c6d8a2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Name outweighs description in ts_rank
+    op.add_column('products', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index(
+        'idx_products_search_vector',
+        'products',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+    # Typo-tolerant fallback: similarity on product names
+    op.create_index(
+        'idx_products_name_trgm',
+        'products',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_products_name_trgm', table_name='products')
+    op.drop_index('idx_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
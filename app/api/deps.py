@@ -1,12 +1,27 @@
 from typing import Annotated
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.compression import negotiate_encoding
+from app.core.metrics import record_auth_cache
 from app.core.telegram_auth import get_user_from_init_data
-from app.database import get_async_session
+from app.database import get_async_session, get_read_session
 from app.models.user import User
+from app.services.catalog_cache import catalog_cache
+
+# Resolved users are kept per worker so repeat calls skip the DB entirely.
+# Nothing evicts an entry when its row changes: a cached user's profile
+# fields may be up to USER_CACHE_TTL seconds old. Routes only rely on the
+# immutable telegram_id; GET /users/me re-reads the row.
+USER_CACHE_SIZE = 10_000
+USER_CACHE_TTL = 300
+
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
 
 
 async def get_current_user(
@@ -34,6 +49,11 @@ async def get_current_user(
             detail="User ID not found in initData"
         )
 
+    user = _user_cache.get(telegram_id)
+    record_auth_cache("user", user is not None)
+    if user is not None:
+        return user
+
     result = await session.execute(
         select(User).where(User.telegram_id == telegram_id)
     )
@@ -42,14 +62,97 @@ async def get_current_user(
     # Lazy onboarding: create user on first request
     # This is intentional for Telegram Mini App MVP - no explicit registration needed
     if not user:
-        user = User(
-            telegram_id=telegram_id,
-            username=user_data.get("username"),
-            first_name=user_data.get("first_name"),
-            last_name=user_data.get("last_name")
+        user = await _create_user(session, telegram_id, user_data)
+
+    # Cached instances are detached once the request session closes; they are
+    # only read (expire_on_commit=False keeps all attributes loaded)
+    _user_cache.set(telegram_id, user)
+    return user
+
+
+async def get_current_manager(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency for manager-only routes: the user must be listed in
+    MANAGER_USER_IDS or be the private chat MANAGER_CHAT_ID points to.
+    """
+    if current_user.telegram_id not in settings.MANAGER_USER_IDS and current_user.telegram_id != settings.MANAGER_CHAT_ID:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Manager access required"
         )
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
+    return current_user
+
+
+async def _create_user(session: AsyncSession, telegram_id: int, user_data: dict) -> User:
+    """
+    Insert user in a single statement.
+
+    ON CONFLICT DO NOTHING makes parallel first requests safe: the loser gets
+    no row back and reads the one the winner committed.
+    """
+    result = await session.execute(
+        select(User).from_statement(
+            insert(User)
+            .values(
+                telegram_id=telegram_id,
+                username=user_data.get("username"),
+                first_name=user_data.get("first_name"),
+                last_name=user_data.get("last_name")
+            )
+            .on_conflict_do_nothing(index_elements=[User.telegram_id])
+            .returning(User)
+        )
+    )
+    user = result.scalar_one_or_none()
+    await session.commit()
+
+    if user is None:
+        result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        user = result.scalar_one()
 
     return user
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def catalog_etag(cache_control: str = "public, max-age=0, must-revalidate"):
+    """
+    Dependency factory for conditional GETs on catalog routes.
+
+    The ETag is derived from the catalog version, which changes on every
+    products/categories edit, and from the content encoding negotiated for
+    the request, since gzip and brotli bodies are different representations.
+    A matching If-None-Match is answered with 304 before the endpoint runs
+    its query or serialization.
+
+    Usage: dependencies=[Depends(catalog_etag("public, max-age=60"))]
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_read_session)
+    ) -> None:
+        version = await catalog_cache.get_version(session)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        etag = f'"catalog-{version}-{encoding}"' if encoding else f'"catalog-{version}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            # 304 carries no body; the exception handler returns headers only
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+
+    return dependency
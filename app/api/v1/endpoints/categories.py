@@ -1,20 +1,34 @@
 from typing import Union
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session
-from app.schemas.category import Category, CategoryWithChildren
+from app.api.deps import catalog_etag
+from app.core.compression import EncodedBody
+from app.core.serialization import ResponseShape
+from app.database import get_read_session
+from app.schemas.category import Category, CategoryTree, CategoryWithChildren
+from app.services.catalog_cache import catalog_cache
 from app.services.category_service import CategoryService
 
 router = APIRouter()
 
+CATEGORY_SHAPE = ResponseShape(Category)
+CATEGORY_WITH_CHILDREN_SHAPE = ResponseShape(CategoryWithChildren)
 
-@router.get("", response_model=Union[list[Category], list[CategoryWithChildren]])
+
+@router.get(
+    "",
+    response_model=Union[list[Category], list[CategoryWithChildren]],
+    dependencies=[Depends(catalog_etag("public, max-age=60, must-revalidate"))]
+)
 async def get_categories(
+    request: Request,
+    response: Response,
     parent_id: int | None = Query(None, description="Filter by parent category ID. Use 'null' for root categories"),
     is_active: bool | None = Query(None, description="Filter by active status"),
     include_children: bool = Query(False, description="Include child categories in response"),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get categories with optional filters.
@@ -25,19 +39,67 @@ async def get_categories(
     - GET /categories?include_children=true - Root categories with their children
     - GET /categories?is_active=true - Only active categories
     """
+    body = await catalog_cache.get_or_load(
+        session,
+        ("categories_body", parent_id, is_active, include_children),
+        lambda: _load_categories_body(session, parent_id, is_active, include_children)
+    )
+    return await body.to_response(request.headers.get("accept-encoding"), response)
+
+
+async def _load_categories_body(
+    session: AsyncSession,
+    parent_id: int | None,
+    is_active: bool | None,
+    include_children: bool
+) -> EncodedBody:
     categories = await CategoryService.get_all(
         session,
         parent_id=parent_id,
         is_active=is_active,
         include_children=include_children
     )
-    return categories
+    shape = CATEGORY_WITH_CHILDREN_SHAPE if include_children else CATEGORY_SHAPE
+    return EncodedBody(to_json(shape.dump_many(categories)))
+
+
+@router.get(
+    "/tree",
+    response_model=list[CategoryTree],
+    dependencies=[Depends(catalog_etag("public, max-age=60, must-revalidate"))]
+)
+async def get_category_tree(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Get the whole active category hierarchy in one response.
+
+    Each node carries is_info_only / coming_soon flags and nested children,
+    so the client doesn't need to request children per node.
+    """
+    body = await catalog_cache.get_or_load(
+        session,
+        ("category_tree_body",),
+        lambda: _load_category_tree_body(session)
+    )
+    return await body.to_response(request.headers.get("accept-encoding"), response)
+
+
+async def _load_category_tree_body(session: AsyncSession) -> EncodedBody:
+    # Tree nodes are already CategoryTree models; only the encoding is left
+    return EncodedBody(to_json(await CategoryService.get_tree(session)))
 
 
-@router.get("/{category_id}", response_model=Category)
+@router.get(
+    "/{category_id}",
+    response_model=Category,
+    dependencies=[Depends(catalog_etag("public, max-age=60, must-revalidate"))]
+)
 async def get_category(
     category_id: int,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get a single category by ID"""
     category = await CategoryService.get_by_id(session, category_id)
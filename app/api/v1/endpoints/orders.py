@@ -1,50 +1,151 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from datetime import datetime
+from typing import Literal, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session
-from app.api.deps import get_current_user
+from app.database import get_async_session, get_read_session, get_read_session_maker
+from app.api.deps import get_current_manager, get_current_user
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor
+from app.core.serialization import ResponseShape, json_response
+from app.models.enums import OrderStatus
 from app.models.user import User
-from app.schemas.order import Order, OrderCreate
+from app.schemas.order import Order, OrderCreate, OrderSummary
+from app.services.idempotency_service import IDEMPOTENCY_KEY_HEADER, IDEMPOTENT_REPLAYED_HEADER, IdempotencyService
+from app.services.order_export_service import EXPORT_MEDIA_TYPES, OrderExportService
 from app.services.order_service import OrderService
-from app.services.telegram_bot import TelegramBotService
 
 router = APIRouter()
 
+ORDER_SHAPE = ResponseShape(Order)
+ORDER_SUMMARY_SHAPE = ResponseShape(OrderSummary)
+
 
 @router.post("", response_model=Order, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
-    background_tasks: BackgroundTasks,
+    idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER, min_length=1, max_length=255),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Create new order.
     Requires valid Telegram initData in Authorization header.
+    The manager is notified by the outbox worker (python -m app.outbox_worker).
+
+    Retries that send the same Idempotency-Key get the stored response of the
+    first request (marked with Idempotent-Replayed: true) instead of a new order.
     """
-    order = await OrderService.create_order(
+    if idempotency_key is not None:
+        user_id = current_user.telegram_id
+        request_hash = IdempotencyService.fingerprint(order_data)
+
+        stored = await IdempotencyService.get_response(session, user_id, idempotency_key, request_hash)
+        # claim() waits for a concurrent request with the same key to finish
+        if stored is None and not await IdempotencyService.claim(session, user_id, idempotency_key, request_hash):
+            stored = await IdempotencyService.get_response(session, user_id, idempotency_key, request_hash)
+            if stored is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress"
+                )
+
+        if stored is not None:
+            return JSONResponse(
+                stored,
+                status_code=status.HTTP_201_CREATED,
+                headers={IDEMPOTENT_REPLAYED_HEADER: "true"}
+            )
+
+    return await OrderService.create_order(
         session,
         user_id=current_user.telegram_id,
-        order_data=order_data
+        order_data=order_data,
+        idempotency_key=idempotency_key
     )
 
-    # Send notification to manager via Telegram Bot in background
-    background_tasks.add_task(TelegramBotService.notify_new_order, order)
-
-    return order
 
-
-@router.get("/my", response_model=list[Order])
+@router.get("/my", response_model=Union[list[Order], list[OrderSummary]])
 async def get_my_orders(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    summary: bool = Query(False, description="Return order headers with items_count instead of items"),
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
-    Get all orders for current user.
+    Get orders of current user page by page, newest first.
     Requires valid Telegram initData in Authorization header.
+
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    Served from the read replica when one is configured; an order created
+    moments ago may show up after the replica catches up.
+    """
+    after = None
+    if cursor:
+        created_at, order_id = decode_cursor(cursor, (str, int))
+        try:
+            after = (datetime.fromisoformat(created_at), order_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    orders, next_cursor = await OrderService.get_user_orders(
+        session,
+        current_user.telegram_id,
+        limit=limit,
+        after=after,
+        summary=summary
+    )
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    shape = ORDER_SUMMARY_SHAPE if summary else ORDER_SHAPE
+    return json_response(shape.dump_many(orders), response)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}}
+)
+async def export_orders(
+    export_format: Literal["csv", "jsonl"] = Query("csv", alias="format"),
+    date_from: datetime | None = Query(None, description="Orders created at or after this time"),
+    date_to: datetime | None = Query(None, description="Orders created before this time"),
+    order_status: OrderStatus | None = Query(None, alias="status"),
+    manager: User = Depends(get_current_manager)
+):
+    """
+    Export orders of all users with their items, oldest first.
+    Managers only (MANAGER_USER_IDS).
+
+    The body is streamed from a server-side cursor as it is encoded, so any
+    date range works without loading it into memory. Served from the read
+    replica when one is configured.
     """
-    orders = await OrderService.get_user_orders(session, current_user.telegram_id)
-    return orders
+    if date_from is not None and date_to is not None and date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must be earlier than date_to"
+        )
+
+    # The body outlives this handler (and its dependencies), so it opens its own session
+    session_maker = await get_read_session_maker()
+
+    async def body():
+        async with session_maker() as session:
+            async for chunk in OrderExportService.stream(session, export_format, date_from, date_to, order_status):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{export_format}"'}
+    )
 
 
 @router.get("/{order_id}", response_model=Order)
@@ -1,34 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from decimal import Decimal
+from typing import Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session
-from app.schemas.product import Product, ProductWithCategory
+from app.api.deps import catalog_etag
+from app.core.compression import EncodedBody
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor
+from app.core.serialization import ResponseShape, json_response
+from app.database import get_read_session
+from app.schemas.product import Product, ProductListWithFacets, ProductSort, ProductWithCategory
+from app.services.catalog_cache import catalog_cache
 from app.services.product_service import ProductService
 
 router = APIRouter()
 
+PRODUCT_SHAPE = ResponseShape(ProductWithCategory)
 
-@router.get("", response_model=list[ProductWithCategory])
+
+def _is_cacheable_page(min_price: Decimal | None, max_price: Decimal | None, limit: int) -> bool:
+    # Only the pages the shop front reads are cached: default size, no price
+    # range. Every cached body then holds at most DEFAULT_PAGE_SIZE products,
+    # so CATALOG_CACHE_SIZE bounds its memory, and one-off price filters or
+    # page sizes can't evict the shared pages
+    return min_price is None and max_price is None and limit == DEFAULT_PAGE_SIZE
+
+
+@router.get(
+    "",
+    response_model=Union[list[ProductWithCategory], ProductListWithFacets],
+    dependencies=[Depends(catalog_etag("public, max-age=30, must-revalidate"))]
+)
 async def get_products(
+    request: Request,
+    response: Response,
     category_id: int | None = Query(None),
-    session: AsyncSession = Depends(get_async_session)
+    include_descendants: bool = Query(False, description="Also include products of all subcategories"),
+    min_price: Decimal | None = Query(None, ge=0),
+    max_price: Decimal | None = Query(None, ge=0),
+    sort: ProductSort = Query(ProductSort.DEFAULT),
+    include_facets: bool = Query(False, description="Wrap items with per-category and per-price-bucket counts"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
-    Get all products. Optionally filter by category_id.
+    Get products page by page. Optionally filter by category_id;
+    with include_descendants=true the whole subtree of the category is listed.
     Only returns active products.
+
+    The cursor of the next page is returned in the X-Next-Cursor header;
+    it is absent on the last page. A cursor is only valid for the sort it came from.
+
+    With include_facets=true the response is {"items": [...], "facets": {...}}.
     """
-    products = await ProductService.get_all(
+    after = ProductService.parse_cursor(cursor, sort) if cursor else None
+
+    def load_body():
+        return _load_products_body(
+            session, after, category_id, include_descendants, min_price, max_price, sort, include_facets, limit
+        )
+
+    if _is_cacheable_page(min_price, max_price, limit):
+        # The encoded (and compressed) page is cached per catalog version
+        body = await catalog_cache.get_or_load(
+            session,
+            ("products_body", category_id, include_descendants, sort, include_facets, cursor),
+            load_body
+        )
+    else:
+        body = await load_body()
+    return await body.to_response(request.headers.get("accept-encoding"), response)
+
+
+async def _load_products_body(
+    session: AsyncSession,
+    after: list | None,
+    category_id: int | None,
+    include_descendants: bool,
+    min_price: Decimal | None,
+    max_price: Decimal | None,
+    sort: ProductSort,
+    include_facets: bool,
+    limit: int
+) -> EncodedBody:
+    products, next_cursor = await ProductService.get_page(
         session,
+        limit=limit,
+        after=after,
         category_id=category_id,
-        only_active=True
+        only_active=True,
+        include_descendants=include_descendants,
+        min_price=min_price,
+        max_price=max_price,
+        sort=sort
+    )
+
+    content = PRODUCT_SHAPE.dump_many(products)
+    if include_facets:
+        facets = await ProductService.get_facets(
+            session,
+            category_id=category_id,
+            include_descendants=include_descendants,
+            min_price=min_price,
+            max_price=max_price
+        )
+        content = {"items": content, "facets": facets}
+
+    return EncodedBody(to_json(content), headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+
+@router.get(
+    "/search",
+    response_model=list[ProductWithCategory],
+    dependencies=[Depends(catalog_etag("public, max-age=30, must-revalidate"))]
+)
+async def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Search active products by name and description, best matches first.
+    Falls back to fuzzy name matching when nothing matches exactly.
+
+    Paginated like GET /products: the next page cursor is in X-Next-Cursor.
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor, (str, float, int))
+        if after[0] not in ("fts", "trgm"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    products, next_cursor = await ProductService.search(
+        session,
+        q=q,
+        limit=limit,
+        after=after
     )
-    return products
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(PRODUCT_SHAPE.dump_many(products), response)
 
 
-@router.get("/{product_id}", response_model=ProductWithCategory)
+@router.get(
+    "/{product_id}",
+    response_model=ProductWithCategory,
+    dependencies=[Depends(catalog_etag("public, max-age=60, must-revalidate"))]
+)
 async def get_product(
     product_id: int,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get product by ID."""
     product = await ProductService.get_by_id(session, product_id)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
+from app.database import get_async_session
 from app.models.user import User
 from app.schemas.user import User as UserSchema
 
@@ -9,11 +11,20 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
 async def get_me(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Get current user information.
 
     Requires valid Telegram initData in Authorization header.
     """
-    return current_user
+    # current_user may come from the per-worker cache with stale fields.
+    # On a cache miss it is already in this session and no query is made.
+    user = await session.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
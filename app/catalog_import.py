@@ -0,0 +1,453 @@
+"""
+Catalog import: applies a supplier feed of products (and categories).
+
+    python -m app.catalog_import products.csv [--categories categories.jsonl]
+                                 [--deactivate-missing] [--dry-run]
+                                 [--skip-invalid] [--batch-size 5000]
+
+Feeds are CSV with a header row or JSON Lines (.csv, .jsonl/.ndjson), plain
+or gzip-compressed (.gz). Columns are the fields of CategoryImportRow and
+ProductImportRow; rows are matched to the catalog by external_id, and a
+category without one is adopted by its slug on first import.
+
+Rows are validated and copied into temporary staging tables in batches of
+--batch-size, so memory stays flat whatever the file size and the shop
+keeps serving the current catalog while a large feed loads. The diff
+against the catalog is then reported and applied in one short transaction:
+categories and products are upserted, unchanged rows are not touched, and
+with --deactivate-missing products imported earlier but absent from the feed
+are deactivated. Products created by hand (no external_id) are never
+touched. --dry-run stops after the report.
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterator, TextIO
+
+from pydantic import ValidationError
+
+from app.database import engine
+from app.schemas.catalog_import import CategoryImportRow, ImportRow, ProductImportRow
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Invalid rows listed in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# The apply transaction waits this long for locks held by the app (e.g. a
+# checkout updating stock) before giving up instead of queueing behind them
+APPLY_LOCK_TIMEOUT = "10s"
+
+# `id` and `changes` are filled in after loading: the matched catalog row
+# (NULL for new ones) and the columns the feed changes in it
+STAGING_SQL = """
+    CREATE TEMP TABLE import_categories (
+        line bigint NOT NULL,
+        external_id text NOT NULL,
+        name text NOT NULL,
+        slug text NOT NULL,
+        parent_external_id text,
+        sort_order integer NOT NULL,
+        is_active boolean NOT NULL,
+        is_info_only boolean NOT NULL,
+        coming_soon boolean NOT NULL,
+        id integer,
+        changes text[]
+    );
+    CREATE TEMP TABLE import_products (
+        line bigint NOT NULL,
+        external_id text NOT NULL,
+        name text NOT NULL,
+        description text,
+        price numeric(10, 2) NOT NULL,
+        images text NOT NULL,
+        category_external_id text NOT NULL,
+        is_active boolean NOT NULL,
+        sort_order integer NOT NULL,
+        stock integer,
+        id integer,
+        changes text[]
+    );
+"""
+
+# A feed may list the same external_id twice; its last line wins
+DEDUPLICATE_SQL = """
+    CREATE INDEX ON {table} (external_id, line);
+    ANALYZE {table};
+    DELETE FROM {table} a USING {table} b
+    WHERE a.external_id = b.external_id AND a.line < b.line
+"""
+
+# Categories without an external_id yet are adopted by slug
+MATCH_CATEGORIES_SQL = """
+    UPDATE import_categories s SET id = c.id
+    FROM categories c
+    WHERE c.external_id = s.external_id;
+
+    UPDATE import_categories s SET id = c.id
+    FROM categories c
+    WHERE s.id IS NULL AND c.external_id IS NULL AND c.slug = s.slug
+"""
+
+# Slugs are unique: a category may not take the slug of another catalog row
+# (one with a different external_id, or any row for a new category) or of an
+# earlier line of the feed. Applying such a row would fail the whole import
+SLUG_CONFLICTS_SQL = """
+    SELECT line, external_id, slug AS reference FROM import_categories s
+    WHERE EXISTS (SELECT 1 FROM categories c WHERE c.slug = s.slug AND c.id IS DISTINCT FROM s.id)
+       OR EXISTS (SELECT 1 FROM import_categories o WHERE o.slug = s.slug AND o.line < s.line)
+    ORDER BY line
+"""
+
+# Rows referring to a category (or parent) neither in the catalog nor in the feed
+DANGLING_CATEGORIES_SQL = """
+    SELECT line, external_id, parent_external_id AS reference FROM import_categories s
+    WHERE parent_external_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM import_categories p WHERE p.external_id = s.parent_external_id)
+      AND NOT EXISTS (SELECT 1 FROM categories p WHERE p.external_id = s.parent_external_id)
+    ORDER BY line
+"""
+
+DANGLING_PRODUCTS_SQL = """
+    SELECT line, external_id, category_external_id AS reference FROM import_products s
+    WHERE NOT EXISTS (SELECT 1 FROM import_categories c WHERE c.external_id = s.category_external_id)
+      AND NOT EXISTS (SELECT 1 FROM categories c WHERE c.external_id = s.category_external_id)
+    ORDER BY line
+"""
+
+# Referenced categories resolve through the staging table first, so the ones
+# adopted by slug count as already in the catalog
+DIFF_CATEGORIES_SQL = """
+    UPDATE import_categories s SET changes = d.changes
+    FROM (
+        SELECT s.line, array_remove(ARRAY[
+            CASE WHEN c.external_id IS DISTINCT FROM s.external_id THEN 'external_id' END,
+            CASE WHEN c.name IS DISTINCT FROM s.name THEN 'name' END,
+            CASE WHEN c.slug IS DISTINCT FROM s.slug THEN 'slug' END,
+            CASE WHEN c.parent_id IS DISTINCT FROM coalesce(sp.id, p.id) THEN 'parent_id' END,
+            CASE WHEN c.sort_order IS DISTINCT FROM s.sort_order THEN 'sort_order' END,
+            CASE WHEN c.is_active IS DISTINCT FROM s.is_active THEN 'is_active' END,
+            CASE WHEN c.is_info_only IS DISTINCT FROM s.is_info_only THEN 'is_info_only' END,
+            CASE WHEN c.coming_soon IS DISTINCT FROM s.coming_soon THEN 'coming_soon' END
+        ], NULL) AS changes
+        FROM import_categories s
+        JOIN categories c ON c.id = s.id
+        LEFT JOIN import_categories sp ON sp.external_id = s.parent_external_id
+        LEFT JOIN categories p ON p.external_id = s.parent_external_id
+    ) d
+    WHERE s.line = d.line
+"""
+
+DIFF_PRODUCTS_SQL = """
+    UPDATE import_products s SET id = d.id, changes = d.changes
+    FROM (
+        SELECT s.line, p.id, array_remove(ARRAY[
+            CASE WHEN p.name IS DISTINCT FROM s.name THEN 'name' END,
+            CASE WHEN p.description IS DISTINCT FROM s.description THEN 'description' END,
+            CASE WHEN p.price IS DISTINCT FROM s.price THEN 'price' END,
+            CASE WHEN p.images::jsonb IS DISTINCT FROM s.images::jsonb THEN 'images' END,
+            CASE WHEN p.category_id IS DISTINCT FROM coalesce(sc.id, c.id) THEN 'category_id' END,
+            CASE WHEN p.is_active IS DISTINCT FROM s.is_active THEN 'is_active' END,
+            CASE WHEN p.sort_order IS DISTINCT FROM s.sort_order THEN 'sort_order' END,
+            CASE WHEN s.stock IS NOT NULL AND p.stock IS DISTINCT FROM s.stock THEN 'stock' END
+        ], NULL) AS changes
+        FROM import_products s
+        JOIN products p ON p.external_id = s.external_id
+        LEFT JOIN import_categories sc ON sc.external_id = s.category_external_id
+        LEFT JOIN categories c ON c.external_id = s.category_external_id
+    ) d
+    WHERE s.line = d.line
+"""
+
+DIFF_SUMMARY_SQL = """
+    SELECT id IS NULL AS is_new, coalesce(changes, '{{}}') AS changes, count(*)
+    FROM {table}
+    GROUP BY 1, 2
+"""
+
+# Imported earlier (has external_id), still active, no longer in the feed
+MISSING_PRODUCTS_SQL = """
+    CREATE TEMP TABLE import_missing AS
+    SELECT p.id FROM products p
+    WHERE p.external_id IS NOT NULL AND p.is_active
+      AND NOT EXISTS (SELECT 1 FROM import_products s WHERE s.external_id = p.external_id)
+"""
+
+# Matched categories are updated in place (which also stamps external_id on
+# the ones adopted by slug), new ones are inserted as roots and their ids
+# recorded, then every staged category is moved under its parent. The path
+# triggers recompute paths of moved categories and their subtrees.
+APPLY_CATEGORIES_SQL = """
+    UPDATE categories c SET
+        external_id = s.external_id,
+        name = s.name,
+        slug = s.slug,
+        sort_order = s.sort_order,
+        is_active = s.is_active,
+        is_info_only = s.is_info_only,
+        coming_soon = s.coming_soon
+    FROM import_categories s
+    WHERE c.id = s.id
+      AND (c.external_id, c.name, c.slug, c.sort_order, c.is_active, c.is_info_only, c.coming_soon)
+          IS DISTINCT FROM
+          (s.external_id, s.name, s.slug, s.sort_order, s.is_active, s.is_info_only, s.coming_soon);
+
+    WITH inserted AS (
+        INSERT INTO categories (external_id, name, slug, sort_order, is_active, is_info_only, coming_soon)
+        SELECT external_id, name, slug, sort_order, is_active, is_info_only, coming_soon
+        FROM import_categories
+        WHERE id IS NULL
+        RETURNING id, external_id
+    )
+    UPDATE import_categories s SET id = inserted.id
+    FROM inserted
+    WHERE s.external_id = inserted.external_id;
+
+    UPDATE categories c SET parent_id = p.id
+    FROM import_categories s
+    LEFT JOIN categories p ON p.external_id = s.parent_external_id
+    WHERE c.id = s.id AND c.parent_id IS DISTINCT FROM p.id
+"""
+
+# Only the rows the diff found changed or new are written, so re-importing a
+# mostly unchanged feed touches (and locks) few products. Stock left out of
+# the feed keeps its current value.
+APPLY_PRODUCTS_SQL = """
+    UPDATE products p SET
+        name = s.name,
+        description = s.description,
+        price = s.price,
+        images = s.images::json,
+        category_id = c.id,
+        is_active = s.is_active,
+        sort_order = s.sort_order,
+        stock = coalesce(s.stock, p.stock)
+    FROM import_products s
+    JOIN categories c ON c.external_id = s.category_external_id
+    WHERE p.id = s.id AND s.changes <> '{}';
+
+    INSERT INTO products (external_id, name, description, price, images, category_id, is_active, sort_order, stock)
+    SELECT s.external_id, s.name, s.description, s.price, s.images::json, c.id, s.is_active, s.sort_order, s.stock
+    FROM import_products s
+    JOIN categories c ON c.external_id = s.category_external_id
+    WHERE s.id IS NULL
+"""
+
+DEACTIVATE_MISSING_SQL = """
+    UPDATE products p SET is_active = false
+    FROM import_missing m
+    WHERE p.id = m.id
+"""
+
+
+@dataclass
+class FeedReport:
+    """What a feed (categories or products) would change in the catalog."""
+    name: str
+    staged: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list[str] = field(default_factory=list)
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    changed_fields: Counter = field(default_factory=Counter)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+    def print(self) -> None:
+        print(
+            f"{self.name}: {self.staged} rows, {self.duplicates} duplicates, {self.invalid} invalid"
+        )
+        for error in self.errors:
+            print(f"  {error}")
+        if self.invalid > len(self.errors):
+            print(f"  ... and {self.invalid - len(self.errors)} more")
+
+        fields = ", ".join(f"{name} {count}" for name, count in self.changed_fields.most_common())
+        line = f"  inserted {self.inserted}, updated {self.updated}"
+        if fields:
+            line += f" ({fields})"
+        line += f", unchanged {self.unchanged}"
+        if self.name == "products":
+            line += f", deactivated {self.deactivated}"
+        print(line)
+
+
+def rowcount(status: str) -> int:
+    """Row count from an asyncpg command status such as 'DELETE 3'."""
+    return int(status.rsplit(" ", 1)[-1])
+
+
+def open_feed(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def read_feed(path: str) -> Iterator[tuple[int, dict | str]]:
+    """(line number, row) pairs: dicts for CSV, raw JSON text for JSON Lines."""
+    name = path.removesuffix(".gz")
+    with open_feed(path) as f:
+        if name.endswith(".csv"):
+            # Line numbers count the header, as an editor shows them
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield line, row
+        elif name.endswith((".jsonl", ".ndjson")):
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    yield line, text
+        else:
+            raise SystemExit(f"{path}: expected a .csv, .jsonl or .ndjson file (optionally .gz)")
+
+
+async def stage(
+    connection, path: str, table: str, row_model: type[ImportRow], report: FeedReport, batch_size: int
+) -> None:
+    """Validate the feed and COPY its rows into `table`, `batch_size` rows at a time."""
+    columns = ("line", *row_model.COLUMNS)
+    batch = []
+    for line, raw in read_feed(path):
+        try:
+            if isinstance(raw, str):
+                row = row_model.model_validate_json(raw)
+            else:
+                row = row_model.model_validate(raw)
+        except ValidationError as e:
+            report.add_error(line, "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in e.errors()
+            ))
+            continue
+
+        batch.append((line, *row.as_record()))
+        if len(batch) >= batch_size:
+            await connection.copy_records_to_table(table, records=batch, columns=columns)
+            report.staged += len(batch)
+            batch = []
+
+    if batch:
+        await connection.copy_records_to_table(table, records=batch, columns=columns)
+        report.staged += len(batch)
+
+    report.duplicates = rowcount(await connection.execute(DEDUPLICATE_SQL.format(table=table)))
+    report.staged -= report.duplicates
+
+
+async def check_rows(connection, table: str, sql: str, report: FeedReport, problem: str) -> None:
+    """Report and unstage the rows `sql` finds unappliable, like rows that failed validation."""
+    rejected = await connection.fetch(sql)
+    for row in rejected:
+        report.add_error(row["line"], f"{row['external_id']}: {problem} {row['reference']!r}")
+    if rejected:
+        await connection.execute(
+            f"DELETE FROM {table} WHERE line = ANY($1::bigint[])", [row["line"] for row in rejected]
+        )
+        report.staged -= len(rejected)
+
+
+async def diff(connection, table: str, sql: str, report: FeedReport) -> None:
+    """Record the changes of every staged row in `table` and count them into the report."""
+    await connection.execute(sql)
+    # Fresh statistics for the apply statements, which filter on the diff
+    await connection.execute(f"ANALYZE {table}")
+    for row in await connection.fetch(DIFF_SUMMARY_SQL.format(table=table)):
+        if row["is_new"]:
+            report.inserted += row["count"]
+        elif row["changes"]:
+            report.updated += row["count"]
+            for name in row["changes"]:
+                report.changed_fields[name] += row["count"]
+        else:
+            report.unchanged += row["count"]
+
+
+async def apply(connection, deactivate_missing: bool) -> None:
+    """The only part that writes to the catalog: one transaction applying the diff."""
+    async with connection.transaction():
+        await connection.execute(f"SET LOCAL lock_timeout = '{APPLY_LOCK_TIMEOUT}'")
+        await connection.execute(APPLY_CATEGORIES_SQL)
+        await connection.execute(APPLY_PRODUCTS_SQL)
+        if deactivate_missing:
+            await connection.execute(DEACTIVATE_MISSING_SQL)
+
+
+async def run(args: argparse.Namespace) -> bool:
+    """Import the feed; False if it has invalid rows and nothing was applied."""
+    categories = FeedReport("categories")
+    products = FeedReport("products")
+
+    async with engine.connect() as conn:
+        # COPY needs the driver connection; nothing here goes through SQLAlchemy
+        connection = (await conn.get_raw_connection()).driver_connection
+        await connection.execute(STAGING_SQL)
+        try:
+            started = time.perf_counter()
+            if args.categories:
+                await stage(connection, args.categories, "import_categories", CategoryImportRow,
+                            categories, args.batch_size)
+            await stage(connection, args.products, "import_products", ProductImportRow,
+                        products, args.batch_size)
+            await connection.execute(MATCH_CATEGORIES_SQL)
+            await check_rows(connection, "import_categories", SLUG_CONFLICTS_SQL, categories, "slug taken")
+            # After the slug check: products of unstaged categories become dangling too
+            await check_rows(connection, "import_categories", DANGLING_CATEGORIES_SQL, categories,
+                             "unknown category")
+            await check_rows(connection, "import_products", DANGLING_PRODUCTS_SQL, products, "unknown category")
+
+            await diff(connection, "import_categories", DIFF_CATEGORIES_SQL, categories)
+            await diff(connection, "import_products", DIFF_PRODUCTS_SQL, products)
+            if args.deactivate_missing:
+                products.deactivated = rowcount(await connection.execute(MISSING_PRODUCTS_SQL))
+            print(f"Staged in {time.perf_counter() - started:.1f} s")
+
+            if args.categories:
+                categories.print()
+            products.print()
+
+            if (categories.invalid or products.invalid) and not args.skip_invalid:
+                print("Invalid rows, nothing applied (pass --skip-invalid to import the rest)")
+                return False
+            if args.dry_run:
+                print("Dry run, nothing applied")
+                return True
+
+            started = time.perf_counter()
+            await apply(connection, args.deactivate_missing)
+            print(f"Applied in {time.perf_counter() - started:.2f} s")
+            return True
+        finally:
+            await connection.execute("DROP TABLE IF EXISTS import_categories, import_products, import_missing")
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        applied = await run(args)
+    finally:
+        await engine.dispose()
+    if not applied:
+        raise SystemExit(1)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("products", help="products feed (.csv, .jsonl, optionally .gz)")
+    parser.add_argument("--categories", help="categories feed, applied before products")
+    parser.add_argument("--deactivate-missing", action="store_true",
+                        help="deactivate imported products that are not in the feed")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without applying them")
+    parser.add_argument("--skip-invalid", action="store_true", help="import valid rows even if some are invalid")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per COPY")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
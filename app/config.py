@@ -10,9 +10,45 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    # Optional streaming replica for catalog and order history reads
+    DATABASE_READ_URL: str | None = None
+    DATABASE_READ_MAX_LAG: float = 5.0
+    DATABASE_READ_CHECK_INTERVAL: float = 5.0
     TELEGRAM_BOT_TOKEN: str
     MANAGER_CHAT_ID: int
+    # Telegram user ids allowed to use manager endpoints (GET /orders/export),
+    # as a JSON list: MANAGER_USER_IDS=[111, 222]. The user whose private chat
+    # is MANAGER_CHAT_ID is always a manager
+    MANAGER_USER_IDS: list[int] = []
     DEBUG: bool = False
+    METRICS_ENABLED: bool = True
+
+    # Responses smaller than this are sent uncompressed, bytes
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # Development SQL profiling (app/core/profiling.py): query headers, N+1 warnings, ?profile=1
+    SQL_PROFILING: bool = False
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Telegram Bot API client
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
+    TELEGRAM_TIMEOUT: float = 10.0
+    TELEGRAM_CONNECT_TIMEOUT: float = 5.0
+    TELEGRAM_MAX_CONNECTIONS: int = 20
+    TELEGRAM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+
+    # Bot API flood limits: ~20 messages per minute into one group chat, ~30 per second overall
+    TELEGRAM_CHAT_MESSAGES_PER_MINUTE: float = 20
+    TELEGRAM_CHAT_BURST: int = 3
+    TELEGRAM_GLOBAL_MESSAGES_PER_SECOND: float = 30
+
+    # How long an Idempotency-Key of POST /orders is remembered, seconds
+    IDEMPOTENCY_KEY_TTL: int = 24 * 60 * 60
+
+    # Outbox worker (python -m app.outbox_worker)
+    OUTBOX_BATCH_SIZE: int = 20
+    OUTBOX_POLL_INTERVAL: float = 1.0
 
 
 settings = Settings()
@@ -0,0 +1,193 @@
+"""
+Prometheus metrics.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty
+directory (cleared on every service start) in the environment of the
+workers and of the outbox worker; /metrics then aggregates all processes.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Label for requests that matched no route, so scanners can't blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+DB_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"]
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool is not full)",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including connecting",
+    ["engine"],
+    buckets=DB_QUERY_BUCKETS
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed",
+    ["engine", "operation"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["engine", "operation"],
+    buckets=DB_QUERY_BUCKETS
+)
+
+TELEGRAM_SEND_DURATION = Histogram(
+    "telegram_send_duration_seconds",
+    "Bot API sendMessage latency"
+)
+TELEGRAM_SEND_FAILURES = Counter(
+    "telegram_send_failures_total",
+    "Failed Bot API sendMessage calls",
+    ["reason"]
+)
+
+AUTH_CACHE_REQUESTS = Counter(
+    "auth_cache_requests_total",
+    "Lookups in the verified initData and user caches",
+    ["cache", "result"]
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool exporting its state. Gauges are updated after each get
+    and return, when the pool's own counters are already final (pool events
+    fire too early for that). Labelled with the pool's logging name.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self._metrics_label).observe(time.perf_counter() - started)
+            self._update_gauges()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    @property
+    def _metrics_label(self) -> str:
+        return self.logging_name or "default"
+
+    def _update_gauges(self) -> None:
+        DB_POOL_CHECKED_OUT.labels(self._metrics_label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self._metrics_label).set(self.overflow())
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Export per-statement counts and durations of `engine`. For pool metrics
+    create it with poolclass=InstrumentedQueuePool, pool_logging_name=name.
+    """
+    sync_engine = engine.sync_engine
+    DB_POOL_SIZE.labels(name).set(sync_engine.pool.size())
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERIES.labels(name, operation).inc()
+        DB_QUERY_DURATION.labels(name, operation).observe(time.perf_counter() - context._metrics_started)
+
+
+def record_auth_cache(cache: str, hit: bool) -> None:
+    AUTH_CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request, labelled by the matched route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, template).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, template, str(status_code)).inc()
+
+
+def metrics_response() -> Response:
+    """Current metrics in the Prometheus text format, summed over all workers in multiprocess mode."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    """Drop this process's live gauges on shutdown (multiprocess mode only)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
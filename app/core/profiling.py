@@ -0,0 +1,240 @@
+"""
+SQL profiling for development.
+
+With SQL_PROFILING=true every response carries X-DB-Query-Count and
+X-DB-Time-Ms, slow statements are logged with their route, and statements
+repeated within one request (N+1) are flagged. Adding ?profile=1 to a
+request returns a sampled stack profile in folded format instead of the
+normal body (feed it to flamegraph.pl or https://speedscope.app).
+
+query_budget() asserts the exact number of statements a block runs and
+works without the middleware, e.g. in pytest (tests/test_query_budget.py):
+
+    with query_budget(2):
+        response = await client.get("/api/v1/products/1")
+"""
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+# Sampling profiler: seconds between stack samples and frames kept per sample
+PROFILE_INTERVAL = 0.001
+PROFILE_MAX_DEPTH = 64
+
+
+class QueryStats:
+    """Statements run while this object is current. Nested stats also feed their parents."""
+
+    def __init__(self, scope: Scope | None = None, parent: "QueryStats | None" = None):
+        self.scope = scope
+        self.parent = parent
+        self.count = 0
+        self.time = 0.0
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str | None:
+        """Route template once the request is routed, the raw path before that."""
+        if self.scope is None:
+            return None
+        return getattr(self.scope.get("route"), "path", self.scope["path"])
+
+    def record(self, statement: str, duration: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.time += duration
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _one_line(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_ms: float) -> None:
+    """
+    Record statements of `engine` into the current QueryStats. Costs one
+    ContextVar lookup per statement when nothing is being profiled.
+    SQLAlchemy reuses the text of a compiled statement, so identical
+    shapes with different parameters count as repeats.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            context._profiling_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is None:
+            return
+
+        duration = time.perf_counter() - context._profiling_started
+        stats.record(statement, duration)
+        if duration * 1000 >= slow_query_ms:
+            logger.warning(
+                "Slow query %.1f ms on %s: %s",
+                duration * 1000, stats.route or "-", _one_line(statement)
+            )
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Record the SQL statements run inside the block into the yielded QueryStats."""
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(expected: int) -> Iterator[QueryStats]:
+    """Fail unless the block runs exactly `expected` SQL statements."""
+    with count_queries() as stats:
+        yield stats
+
+    if stats.count != expected:
+        listing = "\n".join(f"  {n}x {_one_line(sql, 200)}" for sql, n in stats.statements.most_common())
+        raise AssertionError(f"Expected {expected} queries, got {stats.count}:\n{listing}")
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread and counts
+    identical stacks. The event loop thread also runs other requests, so
+    under concurrent load their frames show up in the profile too.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "StackSampler":
+        # The sampler needs the GIL to take a sample; by default the running
+        # thread only gives it up every 5 ms
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.interval / 2)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Samples in the folded stack format: `frame;frame;frame count` per line."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware behind SQL_PROFILING; see the module docstring."""
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope, parent=_current_stats.get())
+        token = _current_stats.set(stats)
+        try:
+            if parse_qs(scope.get("query_string", b"").decode()).get("profile") == ["1"]:
+                await self._profile(scope, receive, send, stats)
+            else:
+                await self.app(scope, receive, self._add_headers(send, stats))
+        finally:
+            _current_stats.reset(token)
+
+        for statement, count in stats.repeated(self.n_plus_one_threshold):
+            logger.warning(
+                "Possible N+1 on %s %s: %d x %s",
+                scope["method"], stats.route, count, _one_line(statement)
+            )
+
+    def _add_headers(self, send: Send, stats: QueryStats) -> Send:
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()),
+                    (QUERY_TIME_HEADER.lower().encode(), f"{stats.time * 1000:.2f}".encode()),
+                ]
+            await send(message)
+        return send_wrapper
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, stats: QueryStats) -> None:
+        """Run the request under the sampler, drop its body and answer with the folded stacks."""
+        status_code = 0
+
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        started = time.perf_counter()
+        with StackSampler(threading.get_ident()) as sampler:
+            await self.app(scope, receive, discard)
+        elapsed = time.perf_counter() - started
+
+        header = (
+            f"# {scope['method']} {scope['path']} -> {status_code} in {elapsed * 1000:.1f} ms, "
+            f"{stats.count} queries in {stats.time * 1000:.1f} ms, "
+            f"{sum(sampler.samples.values())} samples every {PROFILE_INTERVAL * 1000:g} ms\n"
+        )
+        body = (header + sampler.folded() + "\n").encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()),
+                (QUERY_TIME_HEADER.lower().encode(), f"{stats.time * 1000:.2f}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,91 @@
+"""
+Fast JSON bodies for list endpoints.
+
+For a returned value FastAPI validates it against response_model (reading
+every ORM attribute and re-parsing every Decimal), dumps the validated
+models to Python dicts and encodes those with the stdlib json module. Rows
+loaded from our own tables already satisfy the schema, so ResponseShape
+copies just the schema's fields out of them and pydantic-core writes the
+JSON in one pass, producing the same bytes. Keep response_model on the
+route for the OpenAPI schema; it is not applied to a returned Response.
+"""
+import types
+from typing import Any, Iterable, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined, to_json
+from sqlalchemy.engine import Row
+
+_shapes: dict[type[BaseModel], "ResponseShape"] = {}
+
+
+def _unwrap(annotation: Any) -> tuple[Any, bool]:
+    """Strip `| None` and one level of list[...]: (inner annotation, is_list)."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+    if get_origin(annotation) is list:
+        return get_args(annotation)[0], True
+    return annotation, False
+
+
+class ResponseShape:
+    """
+    Field layout of a response schema, applied to trusted objects without
+    validation. Reads loaded attributes only, so it never triggers a lazy
+    load; fields missing from an object fall back to their schema default.
+    Pydantic instances (e.g. cached CategoryTree nodes) are passed through.
+    """
+
+    def __new__(cls, schema: type[BaseModel]) -> "ResponseShape":
+        # One shape per schema, which also terminates self-referencing schemas
+        shape = _shapes.get(schema)
+        if shape is None:
+            shape = _shapes[schema] = super().__new__(cls)
+            shape._build(schema)
+        return shape
+
+    def _build(self, schema: type[BaseModel]) -> None:
+        schema.model_rebuild()
+        self.schema = schema
+        self.fields = []
+        for name, field in schema.model_fields.items():
+            annotation, many = _unwrap(field.annotation)
+            nested = None
+            if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+                nested = ResponseShape(annotation)
+            self.fields.append((name, field.default, nested, many))
+
+    def dump(self, obj: Any) -> Any:
+        if isinstance(obj, BaseModel):
+            return obj
+
+        values = obj._mapping if isinstance(obj, Row) else obj.__dict__
+        data = {}
+        for name, default, nested, many in self.fields:
+            value = values.get(name, default)
+            if value is PydanticUndefined:
+                # Required but not loaded as a plain attribute (e.g. a property)
+                value = getattr(obj, name)
+            if nested is not None and value is not None:
+                value = [nested.dump(item) for item in value] if many else nested.dump(value)
+            data[name] = value
+        return data
+
+    def dump_many(self, objs: Iterable[Any]) -> list[Any]:
+        return [self.dump(obj) for obj in objs]
+
+
+def json_response(content: Any, response: Response | None = None, status_code: int = 200) -> Response:
+    """
+    `content` (dicts from ResponseShape, pydantic models, plain values)
+    encoded by pydantic-core. Headers already set on the injected `response`
+    (ETag, X-Next-Cursor) are kept; FastAPI drops them when an endpoint
+    returns its own Response.
+    """
+    result = Response(to_json(content), status_code=status_code, media_type="application/json")
+    if response is not None:
+        result.raw_headers.extend(response.raw_headers)
+    return result
@@ -8,15 +8,39 @@ from urllib.parse import parse_qsl
 from fastapi import HTTPException, status
 
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import record_auth_cache
 
 # Maximum age of initData in seconds (1 hour)
 MAX_INIT_DATA_AGE = 3600
 
+# Number of verified initData strings remembered per worker
+INIT_DATA_CACHE_SIZE = 10_000
+
+# WebApp uses SHA256(bot_token) as secret_key (NOT "WebAppData").
+# The bot token never changes at runtime, so it is derived once at startup.
+_SECRET_KEY = hashlib.sha256(settings.TELEGRAM_BOT_TOKEN.encode()).digest()
+
+# received hash -> (initData string, verified data)
+_verified_cache = TTLCache(maxsize=INIT_DATA_CACHE_SIZE, ttl=MAX_INIT_DATA_AGE)
+
+
+def _extract_hash(init_data: str) -> str | None:
+    """Cheaply pull the hash field out of initData without a full parse."""
+    for part in init_data.split("&"):
+        if part.startswith("hash="):
+            return part[5:]
+    return None
+
 
 def verify_telegram_init_data(init_data: str) -> dict[str, Any]:
     """
     Verify Telegram WebApp initData and return parsed user data.
 
+    The Mini App sends the same initData for its whole session, so verified
+    results are cached by hash until auth_date + MAX_INIT_DATA_AGE.
+    The returned dictionary is shared between requests and must not be modified.
+
     Args:
         init_data: The initData string from Telegram WebApp
 
@@ -26,6 +50,28 @@ def verify_telegram_init_data(init_data: str) -> dict[str, Any]:
     Raises:
         HTTPException: If verification fails
     """
+    received_hash = _extract_hash(init_data)
+    if received_hash:
+        cached = _verified_cache.get(received_hash)
+        # The full string must match: the hash alone must not authorize other fields
+        hit = cached is not None and cached[0] == init_data
+        record_auth_cache("init_data", hit)
+        if hit:
+            return cached[1]
+
+    parsed_data = _verify_init_data(init_data)
+
+    if received_hash:
+        expires_at = None
+        if "auth_date" in parsed_data:
+            expires_at = int(parsed_data["auth_date"]) + MAX_INIT_DATA_AGE
+        _verified_cache.set(received_hash, (init_data, parsed_data), expires_at=expires_at)
+
+    return parsed_data
+
+
+def _verify_init_data(init_data: str) -> dict[str, Any]:
+    """Full initData verification without the cache."""
     try:
         parsed_data = dict(parse_qsl(init_data))
     except Exception:
@@ -46,12 +92,8 @@ def verify_telegram_init_data(init_data: str) -> dict[str, Any]:
         f"{k}={v}" for k, v in sorted(parsed_data.items())
     )
 
-    # WebApp uses SHA256(bot_token) as secret_key (NOT "WebAppData")
-    # Note: Can be cached since bot_token doesn't change, but premature for MVP
-    secret_key = hashlib.sha256(settings.TELEGRAM_BOT_TOKEN.encode()).digest()
-
     calculated_hash = hmac.new(
-        key=secret_key,
+        key=_SECRET_KEY,
         msg=data_check_string.encode(),
         digestmod=hashlib.sha256
     ).hexdigest()
@@ -1,7 +1,16 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
+from app.core import profiling
+from app.core.metrics import InstrumentedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
@@ -11,8 +20,12 @@ class Base(DeclarativeBase):
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="primary"
 )
+instrument_engine(engine, "primary")
+profiling.instrument_engine(engine, settings.SQL_SLOW_QUERY_MS)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -20,7 +33,112 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Optional streaming replica for read-only endpoints (see get_read_session)
+read_engine = create_async_engine(
+    settings.DATABASE_READ_URL,
+    echo=settings.DEBUG,
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="replica"
+) if settings.DATABASE_READ_URL else None
+
+if read_engine is not None:
+    instrument_engine(read_engine, "replica")
+    profiling.instrument_engine(read_engine, settings.SQL_SLOW_QUERY_MS)
+
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if read_engine is not None else None
+
+# Replay lag in seconds; 0 when everything received has been replayed, so an
+# idle primary does not make the replica look stale
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# A health check taking longer than this counts as a failure
+REPLICA_CHECK_TIMEOUT = 1.0
+
+
+class ReplicaMonitor:
+    """
+    Decides whether reads may go to the replica.
+
+    The replica is probed at most once per check interval per worker; it is
+    used while it answers within the timeout and its replay lag is under
+    DATABASE_READ_MAX_LAG, otherwise reads fall back to the primary until
+    a later check succeeds.
+    """
+
+    def __init__(self, check_interval: float, max_lag: float):
+        self.healthy = False
+        self.lag: float | None = None
+        self._check_interval = check_interval
+        self._max_lag = max_lag
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self._check_interval
+
+    async def is_healthy(self) -> bool:
+        if read_engine is None:
+            return False
+
+        if self._check_due():
+            async with self._lock:
+                if self._check_due():
+                    await self._check()
+                    self._checked_at = time.monotonic()
+        return self.healthy
+
+    async def _check(self) -> None:
+        try:
+            async with asyncio.timeout(REPLICA_CHECK_TIMEOUT):
+                async with read_engine.connect() as connection:
+                    self.lag = float((await connection.execute(REPLICA_LAG_SQL)).scalar_one())
+        except Exception as e:
+            if self.healthy:
+                logger.warning("Read replica unavailable, reading from primary: %s", e)
+            self.healthy = False
+            self.lag = None
+            return
+
+        healthy = self.lag <= self._max_lag
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("Read replica back in use (lag %.1fs)", self.lag)
+            else:
+                logger.warning("Read replica lags %.1fs, reading from primary", self.lag)
+        self.healthy = healthy
+
+
+replica_monitor = ReplicaMonitor(
+    check_interval=settings.DATABASE_READ_CHECK_INTERVAL,
+    max_lag=settings.DATABASE_READ_MAX_LAG
+)
+
 
 async def get_async_session() -> AsyncSession:
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_session() -> AsyncSession:
+    """
+    Session for read-only endpoints: the replica when configured and
+    healthy, the primary otherwise. Never use it for writes or for reads
+    that must see the caller's own just-committed changes.
+    """
+    async with (await get_read_session_maker())() as session:
+        yield session
+
+
+async def get_read_session_maker() -> async_sessionmaker:
+    """Session factory behind get_read_session, for reads that outlive the request handler."""
+    return read_session_maker if await replica_monitor.is_healthy() else async_session_maker
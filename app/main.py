@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
@@ -5,12 +6,29 @@ from pathlib import Path
 
 from app.api.v1.api import api_router
 from app.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, mark_process_dead, metrics_response
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.profiling import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, ProfilingMiddleware
+from app.services.idempotency_service import IDEMPOTENT_REPLAYED_HEADER
+from app.services.telegram_bot import TelegramBotService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared keep-alive client for the Bot API, closed cleanly on shutdown
+    TelegramBotService.get_client()
+    yield
+    await TelegramBotService.close()
+    mark_process_dead()
+
 
 app = FastAPI(
     title="BotShop API",
     description="Backend API for BotShop with Telegram authentication",
     version="1.0.0",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,8 +37,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAYED_HEADER, QUERY_COUNT_HEADER, QUERY_TIME_HEADER],
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+if settings.SQL_PROFILING:
+    app.add_middleware(ProfilingMiddleware, n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -34,6 +61,13 @@ async def health():
     return {"status": "ok"}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint; keep it closed to the outside in the reverse proxy."""
+        return metrics_response()
+
+
 @app.get("/test_miniapp.html")
 async def test_miniapp():
     html_path = Path(__file__).parent.parent / "test_miniapp.html"
@@ -3,5 +3,8 @@ from app.models.category import Category
 from app.models.product import Product
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.catalog_version import CatalogVersion
+from app.models.outbox import OutboxMessage
+from app.models.idempotency_key import IdempotencyKey
 
-__all__ = ["User", "Category", "Product", "Order", "OrderItem"]
+__all__ = ["User", "Category", "Product", "Order", "OrderItem", "CatalogVersion", "OutboxMessage", "IdempotencyKey"]
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CatalogVersion(Base):
+    """
+    Single-row counter bumped by triggers on every products/categories change.
+    Workers compare it with their cached copy to drop stale catalog data.
+    """
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
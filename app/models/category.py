@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, Boolean, ForeignKey
+from sqlalchemy import String, Integer, Boolean, ForeignKey, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
 
@@ -9,18 +9,27 @@ class Category(Base):
     __tablename__ = "categories"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Key in the supplier feed (app.catalog_import); NULL for categories created by hand
+    external_id: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True, nullable=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     sort_order: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     # Hierarchy
     parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("categories.id"), nullable=True)
+    # Materialized path '/<root id>/.../<id>/', maintained by DB triggers
+    path: Mapped[str] = mapped_column(Text, nullable=False, server_default="")
 
     # Flags
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     is_info_only: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     coming_soon: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
+    # Active product counts (own / including all descendants). Not columns:
+    # CategoryService fills them from its cached aggregate when loading
+    product_count = 0
+    total_product_count = 0
+
     # Relationships
     products: Mapped[list["Product"]] = relationship("Product", back_populates="category")
     children: Mapped[list["Category"]] = relationship("Category", back_populates="parent")
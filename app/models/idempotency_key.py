@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any
+from sqlalchemy import BigInteger, DateTime, func, String, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Client-supplied Idempotency-Key of a write request, with the response it
+    produced. Written in the same transaction as the write itself.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    # sha256 of the request body: a reused key with a different body is rejected
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import BigInteger, Integer, ForeignKey, DateTime, func, String, JSON, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+from app.models.enums import OutboxStatus
+
+
+class OutboxMessage(Base):
+    """
+    Notification written in the same transaction as the change it reports.
+    Delivered at least once by the outbox worker (app.outbox_worker).
+    """
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    order_id: Mapped[Optional[int]] = mapped_column(ForeignKey("orders.id"), nullable=True)
+    payload: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
+    status: Mapped[OutboxStatus] = mapped_column(
+        SQLEnum(OutboxStatus, values_callable=lambda obj: [e.value for e in obj]),
+        default=OutboxStatus.PENDING,
+        nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    order: Mapped[Optional["Order"]] = relationship("Order")
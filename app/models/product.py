@@ -1,5 +1,6 @@
 from decimal import Decimal
-from sqlalchemy import String, Integer, ForeignKey, Numeric, Text, JSON
+from sqlalchemy import Computed, String, Integer, ForeignKey, Numeric, Text, JSON
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +10,8 @@ class Product(Base):
     __tablename__ = "products"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Key in the supplier feed (app.catalog_import); NULL for products created by hand
+    external_id: Mapped[str | None] = mapped_column(String(255), unique=True, index=True, nullable=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
@@ -17,5 +20,20 @@ class Product(Base):
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
     sort_order: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # Units left for sale; NULL means stock is not tracked. Changes to it do not
+    # bump catalog_version, so cached catalog objects carry a stale value
+    stock: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Full-text search document, generated by Postgres; never loaded unless asked for
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        deferred=True
+    )
+
     category: Mapped["Category"] = relationship("Category", back_populates="products")
     order_items: Mapped[list["OrderItem"]] = relationship("OrderItem", back_populates="product")
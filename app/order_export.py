@@ -0,0 +1,73 @@
+"""
+Order export to a file, the command-line twin of GET /orders/export.
+
+    python -m app.order_export orders.csv [--from 2026-10-01] [--to 2026-11-01]
+                               [--status delivered] [--format jsonl]
+
+The format follows the file extension (.csv, .jsonl) unless --format is
+given; a .gz suffix compresses the output and "-" writes to stdout. Reads
+the primary database (DATABASE_URL) through a server-side cursor, so memory
+stays flat for any number of orders.
+"""
+import argparse
+import asyncio
+import gzip
+import sys
+import time
+from datetime import datetime
+from typing import BinaryIO
+
+from app.database import async_session_maker, engine
+from app.models.enums import OrderStatus
+from app.services.order_export_service import EXPORT_MEDIA_TYPES, OrderExportService
+
+
+def open_output(path: str) -> BinaryIO:
+    if path == "-":
+        return sys.stdout.buffer
+    if path.endswith(".gz"):
+        return gzip.open(path, "wb", compresslevel=6)
+    return open(path, "wb")
+
+
+def detect_format(path: str) -> str:
+    name = path.removesuffix(".gz")
+    for export_format in EXPORT_MEDIA_TYPES:
+        if name.endswith(f".{export_format}"):
+            return export_format
+    raise SystemExit(f"{path}: cannot tell the format from the extension, pass --format")
+
+
+async def main(args: argparse.Namespace) -> None:
+    export_format = args.format or detect_format(args.output)
+    started = time.perf_counter()
+    written = 0
+    output = open_output(args.output)
+    try:
+        async with async_session_maker() as session:
+            async for chunk in OrderExportService.stream(
+                session, export_format, args.date_from, args.date_to, args.status
+            ):
+                output.write(chunk)
+                written += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        await engine.dispose()
+    print(f"Exported {written} bytes in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="output file (.csv, .jsonl, optionally .gz) or - for stdout")
+    parser.add_argument("--from", dest="date_from", type=datetime.fromisoformat,
+                        help="orders created at or after this date/time (ISO 8601)")
+    parser.add_argument("--to", dest="date_to", type=datetime.fromisoformat,
+                        help="orders created before this date/time (ISO 8601)")
+    parser.add_argument("--status", type=OrderStatus, choices=[s.value for s in OrderStatus])
+    parser.add_argument("--format", choices=list(EXPORT_MEDIA_TYPES))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,74 @@
+"""
+Outbox worker: delivers notifications written by the web app.
+
+    python -m app.outbox_worker
+
+Safe to run several instances; rows are claimed with FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import logging
+import signal
+import time
+from contextlib import suppress
+
+from app.config import settings
+from app.core.metrics import mark_process_dead
+from app.database import async_session_maker, engine
+from app.services.idempotency_service import IdempotencyService
+from app.services.outbox_service import OutboxService
+from app.services.telegram_bot import TelegramBotService
+
+logger = logging.getLogger("app.outbox_worker")
+
+# Housekeeping piggybacks on the worker: expired idempotency keys are deleted this often
+PURGE_INTERVAL = 3600.0
+
+
+async def run(stop: asyncio.Event) -> None:
+    """Process batches until `stop` is set, sleeping when the outbox is drained."""
+    purged_at = float("-inf")
+    while not stop.is_set():
+        if time.monotonic() - purged_at >= PURGE_INTERVAL:
+            purged_at = time.monotonic()
+            try:
+                async with async_session_maker() as session:
+                    purged = await IdempotencyService.purge_expired(session)
+                logger.info("Purged %d expired idempotency keys", purged)
+            except Exception:
+                logger.exception("Idempotency key purge failed")
+
+        try:
+            async with async_session_maker() as session:
+                claimed = await OutboxService.process_batch(session, settings.OUTBOX_BATCH_SIZE)
+        except Exception:
+            logger.exception("Outbox batch failed")
+            claimed = 0
+
+        # A full batch means there is probably more work queued
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), settings.OUTBOX_POLL_INTERVAL)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Outbox worker started")
+    try:
+        await run(stop)
+    finally:
+        await TelegramBotService.close()
+        await engine.dispose()
+        mark_process_dead()
+    logger.info("Outbox worker stopped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if settings.DEBUG else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    asyncio.run(main())
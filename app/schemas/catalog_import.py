@@ -0,0 +1,64 @@
+import json
+from decimal import Decimal
+from typing import ClassVar
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+class ImportRow(BaseModel):
+    """One feed line. CSV cells arrive as strings; empty ones mean "not given"."""
+
+    external_id: str = Field(min_length=1, max_length=255)
+
+    @model_validator(mode="before")
+    @classmethod
+    def drop_empty_cells(cls, data):
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value != "" and value is not None}
+        return data
+
+
+class CategoryImportRow(ImportRow):
+    name: str = Field(min_length=1, max_length=255)
+    slug: str = Field(min_length=1, max_length=255)
+    parent_external_id: str | None = Field(None, max_length=255)
+    sort_order: int = 0
+    is_active: bool = True
+    is_info_only: bool = False
+    coming_soon: bool = False
+
+    # Staging table column order (see app.catalog_import)
+    COLUMNS: ClassVar[tuple[str, ...]] = ("external_id", "name", "slug", "parent_external_id", "sort_order",
+                                          "is_active", "is_info_only", "coming_soon")
+
+    def as_record(self) -> tuple:
+        return tuple(getattr(self, column) for column in self.COLUMNS)
+
+
+class ProductImportRow(ImportRow):
+    name: str = Field(min_length=1, max_length=255)
+    description: str | None = None
+    price: Decimal = Field(ge=0, max_digits=10, decimal_places=2)
+    images: list[str] = []
+    category_external_id: str = Field(min_length=1, max_length=255)
+    is_active: bool = True
+    sort_order: int = 0
+    # Omitted: keep the current stock of an existing product
+    stock: int | None = Field(None, ge=0)
+
+    COLUMNS: ClassVar[tuple[str, ...]] = ("external_id", "name", "description", "price", "images",
+                                          "category_external_id", "is_active", "sort_order", "stock")
+
+    @field_validator("images", mode="before")
+    @classmethod
+    def split_images(cls, value):
+        # CSV cell: a JSON array or URLs separated by '|'
+        if isinstance(value, str):
+            if value.lstrip().startswith("["):
+                return json.loads(value)
+            return [url.strip() for url in value.split("|") if url.strip()]
+        return value
+
+    def as_record(self) -> tuple:
+        record = tuple(getattr(self, column) for column in self.COLUMNS)
+        # The staging column is text, cast to json when applied
+        return record[:4] + (json.dumps(self.images, ensure_ascii=False),) + record[5:]
@@ -29,11 +29,20 @@ class Category(CategoryBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    # Active products in this category / in this category and all subcategories
+    product_count: int = 0
+    total_product_count: int = 0
 
 
 class CategoryWithChildren(Category):
     children: list["Category"] = []
 
 
+class CategoryTree(Category):
+    """Category with its whole active subtree."""
+    children: list["CategoryTree"] = []
+
+
 # Support forward reference
 CategoryWithChildren.model_rebuild()
+CategoryTree.model_rebuild()
@@ -47,3 +47,14 @@ class Order(BaseModel):
     created_at: datetime
     updated_at: datetime
     items: list[OrderItemInDB]
+
+
+class OrderSummary(BaseModel):
+    """Order header for history lists, without item rows."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    status: OrderStatus
+    total_amount: Decimal
+    created_at: datetime
+    items_count: int
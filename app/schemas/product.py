@@ -1,5 +1,13 @@
+import enum
 from decimal import Decimal
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ProductSort(str, enum.Enum):
+    DEFAULT = "default"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    NEWEST = "newest"
 
 
 class ProductBase(BaseModel):
@@ -13,7 +21,7 @@ class ProductBase(BaseModel):
 
 
 class ProductCreate(ProductBase):
-    pass
+    stock: int | None = Field(None, ge=0)
 
 
 class ProductUpdate(BaseModel):
@@ -24,6 +32,7 @@ class ProductUpdate(BaseModel):
     category_id: int | None = None
     is_active: bool | None = None
     sort_order: int | None = None
+    stock: int | None = Field(None, ge=0)
 
 
 class Product(ProductBase):
@@ -44,3 +53,25 @@ class CategoryInProduct(BaseModel):
     id: int
     name: str
     slug: str
+
+
+class CategoryFacet(BaseModel):
+    category_id: int
+    count: int
+
+
+class PriceBucketFacet(BaseModel):
+    min_price: Decimal | None
+    max_price: Decimal | None
+    count: int
+
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: list[CategoryFacet]
+    price_buckets: list[PriceBucketFacet]
+
+
+class ProductListWithFacets(BaseModel):
+    items: list[ProductWithCategory]
+    facets: ProductFacets
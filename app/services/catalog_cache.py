@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.models.catalog_version import CatalogVersion
+
+# How often each worker re-reads catalog_version; bounds staleness after an edit
+CATALOG_VERSION_CHECK_INTERVAL = 1.0
+
+# Distinct catalog queries (pages, categories, products) remembered per worker
+CATALOG_CACHE_SIZE = 1024
+
+_MISSING = object()
+
+
+class CatalogCache:
+    """
+    Read-through cache for catalog query results (products and categories).
+
+    Every change to `products` or `categories` bumps `catalog_version.version`
+    through a database trigger. Each worker re-reads the version at most once
+    per check interval and drops all cached results when it has moved, so
+    every worker serves fresh data within about a second of an edit. Between
+    checks, reads are served from memory with no DB I/O.
+
+    Cached values (encoded response bodies, lookup maps, detached ORM
+    objects) are shared between requests: treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int, check_interval: float):
+        self.version: int | None = None
+        self._results = TTLCache(maxsize=maxsize)
+        self._check_interval = check_interval
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self._check_interval
+
+    async def get_version(self, session: AsyncSession) -> int:
+        """Current catalog version, re-read from the DB at most once per interval."""
+        if self._check_due():
+            async with self._lock:
+                if self._check_due():
+                    result = await session.execute(
+                        select(CatalogVersion.version).where(CatalogVersion.id == 1)
+                    )
+                    version = result.scalar_one()
+                    if version != self.version:
+                        self._results.clear()
+                        self.version = version
+                    self._checked_at = time.monotonic()
+        return self.version
+
+    async def get_or_load(
+        self,
+        session: AsyncSession,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return cached result for key, running loader on a miss. None results are cached too."""
+        version = await self.get_version(session)
+
+        value = self._results.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            # Loaded data is at least as new as `version`; if the version moved
+            # meanwhile the entries were cleared and this one is not stored
+            if version == self.version:
+                self._results.set(key, value)
+
+        return value
+
+    def invalidate(self) -> None:
+        """Force a version check on the next read (e.g. right after a local catalog edit)."""
+        self._checked_at = float("-inf")
+
+    def clear(self) -> None:
+        """Drop all cached results and the known version (benchmarks of the uncached path)."""
+        self._results.clear()
+        self.version = None
+        self.invalidate()
+
+
+catalog_cache = CatalogCache(
+    maxsize=CATALOG_CACHE_SIZE,
+    check_interval=CATALOG_VERSION_CHECK_INTERVAL
+)
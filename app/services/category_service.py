@@ -1,8 +1,13 @@
-from sqlalchemy import select
+from collections import defaultdict
+
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.category import Category
+from app.models.product import Product
+from app.schemas.category import Category as CategorySchema, CategoryTree
+from app.services.catalog_cache import catalog_cache
 
 
 class CategoryService:
@@ -13,7 +18,11 @@ class CategoryService:
         is_active: bool | None = None,
         include_children: bool = False
     ) -> list[Category]:
-        """Get categories with optional filters"""
+        """
+        Get categories with optional filters.
+        Not cached here: the category endpoints cache their encoded responses,
+        only the product counts map is shared per catalog version.
+        """
         query = select(Category)
 
         # Filter by parent_id
@@ -33,24 +42,101 @@ class CategoryService:
         query = query.order_by(Category.sort_order, Category.name)
 
         result = await session.execute(query)
-        return list(result.scalars().all())
+        categories = list(result.scalars().all())
+        await CategoryService._attach_counts(session, categories)
+        return categories
 
     @staticmethod
-    async def get_by_id(session: AsyncSession, category_id: int, include_children: bool = False) -> Category | None:
-        query = select(Category).where(Category.id == category_id)
+    async def get_product_counts(session: AsyncSession) -> dict[int, tuple[int, int]]:
+        """
+        Active product counts per category id: (own, including all descendants).
 
-        if include_children:
-            query = query.options(selectinload(Category.children))
+        One GROUP BY over products; the roll-up over descendants follows the
+        materialized path in memory. Cached per catalog version, so it is
+        recomputed only after catalog edits.
+        """
+        return await catalog_cache.get_or_load(
+            session,
+            ("category_product_counts",),
+            lambda: CategoryService._load_product_counts(session)
+        )
 
-        result = await session.execute(query)
-        return result.scalar_one_or_none()
+    @staticmethod
+    async def _load_product_counts(session: AsyncSession) -> dict[int, tuple[int, int]]:
+        result = await session.execute(
+            select(Category.id, Category.path, func.count(Product.id))
+            .outerjoin(Product, and_(Product.category_id == Category.id, Product.is_active == True))
+            .group_by(Category.id)
+        )
+        rows = result.all()
+
+        totals = defaultdict(int)
+        for _, path, count in rows:
+            if count:
+                # path lists every ancestor and the category itself
+                for ancestor_id in path.strip("/").split("/"):
+                    totals[int(ancestor_id)] += count
+
+        return {category_id: (count, totals[category_id]) for category_id, _, count in rows}
+
+    @staticmethod
+    async def _attach_counts(session: AsyncSession, categories: list[Category]) -> None:
+        """Fill product counts on loaded categories and their loaded children."""
+        counts = await CategoryService.get_product_counts(session)
+
+        pending = list(categories)
+        while pending:
+            category = pending.pop()
+            category.product_count, category.total_product_count = counts.get(category.id, (0, 0))
+            # Only follow children that were eagerly loaded; never trigger a lazy load
+            pending.extend(category.__dict__.get("children", ()))
+
+    @staticmethod
+    async def get_tree(session: AsyncSession) -> list[CategoryTree]:
+        """Whole active hierarchy as nested nodes, built from one flat scan."""
+        result = await session.execute(
+            select(Category)
+            .where(Category.is_active == True)
+            .order_by(Category.sort_order, Category.name)
+        )
+        categories = list(result.scalars().all())
+        await CategoryService._attach_counts(session, categories)
+
+        # Validate through the flat schema: the ORM `children` relationship is not loaded
+        nodes = {
+            c.id: CategoryTree(**CategorySchema.model_validate(c).model_dump())
+            for c in categories
+        }
+        roots = []
+
+        # Rows are already sorted, so appending keeps siblings in order.
+        # Nodes under an inactive parent are never attached to a root.
+        for category in categories:
+            node = nodes[category.id]
+            if category.parent_id is None:
+                roots.append(node)
+            elif category.parent_id in nodes:
+                nodes[category.parent_id].children.append(node)
+
+        return roots
+
+    @staticmethod
+    async def get_by_id(session: AsyncSession, category_id: int, include_children: bool = False) -> Category | None:
+        return await CategoryService._load_one(session, Category.id == category_id, include_children)
 
     @staticmethod
     async def get_by_slug(session: AsyncSession, slug: str, include_children: bool = False) -> Category | None:
-        query = select(Category).where(Category.slug == slug)
+        return await CategoryService._load_one(session, Category.slug == slug, include_children)
+
+    @staticmethod
+    async def _load_one(session: AsyncSession, condition, include_children: bool) -> Category | None:
+        query = select(Category).where(condition)
 
         if include_children:
             query = query.options(selectinload(Category.children))
 
         result = await session.execute(query)
-        return result.scalar_one_or_none()
+        category = result.scalar_one_or_none()
+        if category is not None:
+            await CategoryService._attach_counts(session, [category])
+        return category
@@ -0,0 +1,107 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyService:
+    """
+    Idempotency-Key handling for write endpoints.
+
+    A request first looks for a stored response (replay: one indexed read).
+    Otherwise it claims the key by inserting it inside its own transaction
+    and stores the response right before that transaction commits. A
+    concurrent duplicate blocks on the primary key until the first request
+    finishes: after a commit it replays the stored response, after a
+    rollback it takes over the claim.
+    """
+
+    @staticmethod
+    def fingerprint(payload: BaseModel) -> str:
+        return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+    @staticmethod
+    async def get_response(
+        session: AsyncSession,
+        user_id: int,
+        key: str,
+        request_hash: str
+    ) -> dict[str, Any] | None:
+        """Stored response for a completed, unexpired key. 422 if the key was used for another request."""
+        result = await session.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.response)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > func.now(),
+                IdempotencyKey.response.is_not(None)
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        if row.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        return row.response
+
+    @staticmethod
+    async def claim(session: AsyncSession, user_id: int, key: str, request_hash: str) -> bool:
+        """
+        Take the key for this transaction. Expired keys are taken over.
+
+        Waits while another transaction holds the same key; returns False if
+        that transaction committed, i.e. the caller should replay instead.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        stmt = insert(IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            expires_at=expires_at
+        )
+        result = await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+                set_={
+                    "request_hash": stmt.excluded.request_hash,
+                    "response": None,
+                    "created_at": func.now(),
+                    "expires_at": stmt.excluded.expires_at
+                },
+                where=IdempotencyKey.expires_at <= func.now()
+            )
+            .returning(IdempotencyKey.key)
+        )
+        return result.first() is not None
+
+    @staticmethod
+    async def store_response(session: AsyncSession, user_id: int, key: str, response: dict[str, Any]) -> None:
+        """Save the response of a claimed key; call before the transaction commits."""
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(response=response)
+        )
+
+    @staticmethod
+    async def purge_expired(session: AsyncSession) -> int:
+        result = await session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())
+        )
+        await session.commit()
+        return result.rowcount
@@ -1,13 +1,20 @@
+from datetime import datetime
 from decimal import Decimal
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Integer, bindparam, column, func, insert, select, true, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.pagination import encode_cursor
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.product import Product
 from app.models.enums import OrderStatus
-from app.schemas.order import OrderCreate
+from app.schemas.order import Order as OrderSchema, OrderCreate
+from app.services.idempotency_service import IdempotencyService
+from app.services.outbox_service import OutboxService
 from app.services.product_service import ProductService
 
 
@@ -16,15 +23,30 @@ class OrderService:
     async def create_order(
         session: AsyncSession,
         user_id: int,
-        order_data: OrderCreate
+        order_data: OrderCreate,
+        idempotency_key: str | None = None
     ) -> Order:
-        """Create new order with items. Validates products and calculates total."""
+        """
+        Create new order with items. Validates products and calculates total.
+        The manager notification is queued in the outbox in the same transaction.
+        With `idempotency_key` (already claimed in this transaction) the
+        serialized response is stored with it before commit.
+
+        Statements: the product lookup, a single INSERT of the order, its
+        items and the outbox row chained through CTEs, plus the key and the
+        stock reservation when those apply. Server defaults come back via
+        RETURNING, so the result is assembled in memory without a refresh.
+        Repeated product ids are merged into one line.
+        """
+        # Merge duplicate lines, keeping the cart order
+        quantities: dict[int, int] = {}
+        for item in order_data.items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
 
         # Get all products
-        product_ids = [item.product_id for item in order_data.items]
-        products = await ProductService.get_by_ids(session, product_ids)
+        products = await ProductService.get_by_ids(session, list(quantities))
 
-        if len(products) != len(product_ids):
+        if len(products) != len(quantities):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Some products not found"
@@ -38,6 +60,11 @@ class OrderService:
                 detail="Some products are not available"
             )
 
+        # Fail fast on the stock we just read; _reserve_stock re-checks atomically
+        short = [(p, p.stock) for p in products if p.stock is not None and p.stock < quantities[p.id]]
+        if short:
+            raise OrderService._out_of_stock(short, quantities)
+
         # Create products dict for easy access
         products_dict = {p.id: p for p in products}
 
@@ -45,49 +72,247 @@ class OrderService:
         total_amount = Decimal("0")
         order_items = []
 
-        for item_data in order_data.items:
-            product = products_dict[item_data.product_id]
-            item_total = product.price * item_data.quantity
-            total_amount += item_total
+        for product_id, quantity in quantities.items():
+            product = products_dict[product_id]
+            total_amount += product.price * quantity
 
-            order_item = OrderItem(
+            order_items.append(OrderItem(
                 product_id=product.id,
                 product_name=product.name,
-                quantity=item_data.quantity,
+                quantity=quantity,
                 price=product.price
-            )
-            order_items.append(order_item)
+            ))
 
-        # Create order
         order = Order(
             user_id=user_id,
             status=OrderStatus.PENDING,
             total_amount=total_amount,
             delivery_address=order_data.delivery_address,
             phone=order_data.phone,
-            comment=order_data.comment,
-            items=order_items
+            comment=order_data.comment
         )
 
-        session.add(order)
+        result = await session.execute(OrderService._insert_order_statement(order, order_items))
+        rows = result.all()
+
+        # Fill generated columns; `order` stays transient and is never added to the session
+        item_ids = {row.product_id: row.item_id for row in rows}
+        order.id = rows[0].id
+        order.created_at = rows[0].created_at
+        order.updated_at = rows[0].updated_at
+        for order_item in order_items:
+            order_item.id = item_ids[order_item.product_id]
+            order_item.order_id = order.id
+        order.items = order_items
+
+        if idempotency_key is not None:
+            await IdempotencyService.store_response(
+                session,
+                user_id,
+                idempotency_key,
+                OrderSchema.model_validate(order).model_dump(mode="json")
+            )
+
+        # Last statement before commit: hot SKU rows stay locked for one round trip
+        tracked = {p.id: quantities[p.id] for p in products if p.stock is not None}
+        if tracked:
+            await OrderService._reserve_stock(session, tracked)
+
         await session.commit()
-        await session.refresh(order, ["items"])
+        return order
+
+    @staticmethod
+    async def _reserve_stock(session: AsyncSession, quantities: dict[int, int]) -> None:
+        """
+        Take `quantities` off stock with one conditional UPDATE. Rows with
+        too little stock are not touched; if any item comes up short the
+        transaction is rolled back and 409 is raised.
+
+        The rows are locked only by this statement, right before commit, and
+        the condition is re-checked on the latest row version: concurrent
+        checkouts of one SKU queue for that row alone and can never oversell.
+        """
+        product_ids = sorted(quantities)
+        lines = func.unnest(
+            bindparam("product_ids", product_ids, type_=ARRAY(Product.id.type)),
+            bindparam("quantities", [quantities[i] for i in product_ids], type_=ARRAY(Integer))
+        ).table_valued(column("product_id"), column("quantity")).render_derived(name="lines")
+
+        # The join order of a plain UPDATE .. FROM varies with the plan and the
+        # physical row order, which deadlocks two carts sharing SKUs; locking in
+        # a sorted subquery first gives every transaction the same lock order
+        locked = (
+            select(Product.id, lines.c.quantity)
+            .join(lines, Product.id == lines.c.product_id)
+            .order_by(Product.id)
+            .with_for_update(of=Product, key_share=True)
+            .subquery("locked")
+        )
 
+        result = await session.execute(
+            update(Product)
+            .where(Product.id == locked.c.id, Product.stock >= locked.c.quantity)
+            .values(stock=Product.stock - locked.c.quantity)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        reserved = set(result.scalars().all())
+        if len(reserved) == len(product_ids):
+            return
+
+        await session.rollback()
+        result = await session.execute(
+            select(Product).where(Product.id.in_([i for i in product_ids if i not in reserved]))
+        )
+        raise OrderService._out_of_stock(
+            [(p, p.stock or 0) for p in result.scalars().all()],
+            quantities
+        )
+
+    @staticmethod
+    def _out_of_stock(short: list[tuple[Product, int]], quantities: dict[int, int]) -> HTTPException:
+        items = ", ".join(
+            f"{p.name} (id {p.id}): requested {quantities[p.id]}, available {available}"
+            for p, available in short
+        )
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Not enough stock: {items}"
+        )
+
+    @staticmethod
+    async def update_status(session: AsyncSession, order_id: int, new_status: OrderStatus) -> Order | None:
+        """
+        Change order status. Moving an order to CANCELLED returns its items to
+        stock and moving it out of CANCELLED takes them again; both are done
+        by the orders_restock_on_cancel trigger, so manual edits behave the same.
+        """
+        order = await session.get(Order, order_id)
+        if order is None:
+            return None
+
+        order.status = new_status
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Not enough stock to reopen the order"
+            )
         return order
 
+    @staticmethod
+    def _insert_order_statement(order: Order, order_items: list[OrderItem]):
+        """
+        WITH new_order AS (INSERT INTO orders ... RETURNING ...),
+             new_items AS (INSERT INTO order_items SELECT ... FROM new_order, unnest(...) RETURNING ...),
+             new_outbox AS (INSERT INTO outbox SELECT ... FROM new_order)
+        SELECT ... FROM new_order, new_items
+        """
+        new_order = (
+            insert(Order)
+            .values(
+                user_id=order.user_id,
+                status=order.status,
+                total_amount=order.total_amount,
+                delivery_address=order.delivery_address,
+                phone=order.phone,
+                comment=order.comment
+            )
+            .returning(Order.id, Order.created_at, Order.updated_at)
+            .cte("new_order")
+        )
+
+        # unnest() over array parameters rather than a VALUES list: the SQL text
+        # does not depend on the number of items, so it stays in the compiled
+        # statement cache and asyncpg reuses one prepared statement
+        lines = func.unnest(
+            bindparam("product_ids", [item.product_id for item in order_items], type_=ARRAY(OrderItem.product_id.type)),
+            bindparam("product_names", [item.product_name for item in order_items], type_=ARRAY(OrderItem.product_name.type)),
+            bindparam("quantities", [item.quantity for item in order_items], type_=ARRAY(OrderItem.quantity.type)),
+            bindparam("prices", [item.price for item in order_items], type_=ARRAY(OrderItem.price.type))
+        ).table_valued(
+            column("product_id"),
+            column("product_name"),
+            column("quantity"),
+            column("price")
+        ).render_derived(name="lines")
+
+        new_items = (
+            insert(OrderItem)
+            .from_select(
+                ["order_id", "product_id", "product_name", "quantity", "price"],
+                select(new_order.c.id, lines.c.product_id, lines.c.product_name, lines.c.quantity, lines.c.price)
+                .select_from(new_order.join(lines, true()))
+            )
+            .returning(OrderItem.id, OrderItem.product_id)
+            .cte("new_items")
+        )
+
+        new_outbox = OutboxService.order_created(new_order.c.id).cte("new_outbox")
+
+        return (
+            select(
+                new_order.c.id,
+                new_order.c.created_at,
+                new_order.c.updated_at,
+                new_items.c.id.label("item_id"),
+                new_items.c.product_id
+            )
+            .select_from(new_order.join(new_items, true()))
+            .add_cte(new_outbox)
+        )
+
     @staticmethod
     async def get_user_orders(
         session: AsyncSession,
-        user_id: int
-    ) -> list[Order]:
-        """Get all orders for a user."""
-        result = await session.execute(
-            select(Order)
-            .options(selectinload(Order.items))
-            .where(Order.user_id == user_id)
-            .order_by(Order.created_at.desc())
-        )
-        return list(result.scalars().all())
+        user_id: int,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        summary: bool = False
+    ) -> tuple[list, str | None]:
+        """
+        Get a page of user's orders, newest first, keyed by (created_at, id).
+
+        With summary=True returns rows with id/status/total_amount/created_at
+        and items_count instead of Order objects, without loading item rows.
+        Returns the page and the cursor of the next one (None on the last page).
+        """
+        if summary:
+            items_count = (
+                select(func.count(OrderItem.id))
+                .where(OrderItem.order_id == Order.id)
+                .scalar_subquery()
+            )
+            query = select(
+                Order.id,
+                Order.status,
+                Order.total_amount,
+                Order.created_at,
+                items_count.label("items_count")
+            )
+        else:
+            query = select(Order).options(selectinload(Order.items))
+
+        # Served by idx_orders_user_created as an index range scan
+        query = query.where(Order.user_id == user_id)
+
+        if after is not None:
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+
+        query = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
+        result = await session.execute(query)
+        orders = list(result.all() if summary else result.scalars().all())
+
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            last = orders[-1]
+            next_cursor = encode_cursor([last.created_at.isoformat(), last.id])
+
+        return orders, next_cursor
 
     @staticmethod
     async def get_by_id(
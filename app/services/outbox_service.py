@@ -0,0 +1,139 @@
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Insert, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.models.enums import OutboxStatus
+from app.models.order import Order
+from app.models.outbox import OutboxMessage
+from app.services.telegram_bot import TelegramBotService, notification_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Outbox message kinds
+ORDER_CREATED = "order_created"
+
+# Give up after this many failed sends (429 back-offs are not counted)
+OUTBOX_MAX_ATTEMPTS = 10
+
+# Retry delay: base * 2^(attempts-1), capped, plus up to 10% jitter
+OUTBOX_BACKOFF_BASE = 5.0
+OUTBOX_BACKOFF_MAX = 3600.0
+
+
+class OutboxService:
+    @staticmethod
+    def order_created(order_id) -> Insert:
+        """
+        INSERT of the message announcing a new order. `order_id` is a column
+        expression (e.g. of the CTE that inserts the order), so the row is
+        written by the same statement and transaction as the order.
+        """
+        # Python-side column defaults are not applied inside a CTE: spell them out
+        return insert(OutboxMessage).from_select(
+            ["kind", "order_id", "status", "attempts"],
+            select(
+                literal(ORDER_CREATED),
+                order_id,
+                literal(OutboxStatus.PENDING, OutboxMessage.status.type),
+                literal(0)
+            )
+        )
+
+    @staticmethod
+    async def claim_batch(session: AsyncSession, limit: int) -> list[OutboxMessage]:
+        """
+        Lock up to `limit` due pending messages, oldest first.
+
+        SKIP LOCKED lets several workers poll the table at once without
+        blocking on or double-sending each other's rows. The locks are held
+        until the caller commits.
+        """
+        result = await session.execute(
+            select(OutboxMessage)
+            .where(
+                OutboxMessage.status == OutboxStatus.PENDING,
+                OutboxMessage.available_at <= func.now()
+            )
+            .order_by(OutboxMessage.available_at, OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .options(selectinload(OutboxMessage.order).selectinload(Order.items))
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def process_batch(session: AsyncSession, limit: int) -> int:
+        """
+        Claim and send one batch, then commit the outcome. Returns the number
+        of claimed messages.
+
+        Sends go through the notification scheduler: when the manager chat is
+        out of tokens the batch is merged into digests, and whatever still
+        does not fit is pushed back until the bucket refills.
+
+        Delivery is at-least-once: a crash between a send and the commit
+        leaves the rows pending and they are sent again.
+        """
+        messages = await OutboxService.claim_batch(session, limit)
+
+        by_chat: dict[int, list[tuple[OutboxMessage, str]]] = defaultdict(list)
+        for message in messages:
+            try:
+                chat_id, text = OutboxService._render(message)
+            except Exception as e:
+                logger.exception("Outbox message %s could not be rendered", message.id)
+                OutboxService._mark_failed(message, f"{type(e).__name__}: {e}", permanent=True)
+                continue
+            by_chat[chat_id].append((message, text))
+
+        for chat_id, queued in by_chat.items():
+            result = await notification_scheduler.dispatch(chat_id, [text for _, text in queued])
+            now = datetime.now(timezone.utc)
+
+            for message, _ in queued[:result.sent]:
+                message.status = OutboxStatus.SENT
+                message.sent_at = now
+                message.attempts += 1
+                message.last_error = None
+
+            failed = queued[result.sent:result.sent + result.failed]
+            if result.error is not None and result.error.retry_after is None:
+                for message, _ in failed:
+                    OutboxService._mark_failed(message, str(result.error), permanent=result.error.is_permanent)
+                failed = []
+            elif result.error is not None:
+                logger.warning("Telegram rate limit hit, retrying in %.0fs", result.error.retry_after)
+
+            # Rate-limited rows wait for the bucket without spending an attempt
+            for message, _ in failed + queued[result.sent + result.failed:]:
+                message.available_at = now + timedelta(seconds=result.retry_in)
+
+        await session.commit()
+        return len(messages)
+
+    @staticmethod
+    def _render(message: OutboxMessage) -> tuple[int, str]:
+        """Target chat and text of a message."""
+        if message.kind == ORDER_CREATED:
+            return settings.MANAGER_CHAT_ID, TelegramBotService.format_new_order(message.order)
+        raise ValueError(f"Unknown outbox message kind: {message.kind}")
+
+    @staticmethod
+    def _mark_failed(message: OutboxMessage, error: str, permanent: bool) -> None:
+        message.attempts += 1
+        message.last_error = error[:1000]
+
+        if permanent or message.attempts >= OUTBOX_MAX_ATTEMPTS:
+            message.status = OutboxStatus.FAILED
+            logger.error("Outbox message %s failed permanently: %s", message.id, error)
+            return
+
+        delay = min(OUTBOX_BACKOFF_BASE * 2 ** (message.attempts - 1), OUTBOX_BACKOFF_MAX)
+        delay += random.uniform(0, delay * 0.1)
+        message.available_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
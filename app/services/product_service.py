@@ -1,41 +1,327 @@
-from sqlalchemy import select
+from decimal import Decimal, InvalidOperation
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, literal, literal_column, or_, select, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.category import Category
 from app.models.product import Product
+from app.schemas.product import CategoryFacet, PriceBucketFacet, ProductFacets, ProductSort
+from app.services.catalog_cache import catalog_cache
+
+# Lower bounds of price facet buckets (RUB); below the first is its own bucket
+PRICE_BUCKET_BOUNDS = (500, 1000, 2000, 5000, 10000)
+
+# Keyset columns and direction per sort mode; id breaks ties
+_SORT_KEYS = {
+    ProductSort.DEFAULT: ((Product.sort_order, Product.name, Product.id), False),
+    ProductSort.PRICE_ASC: ((Product.price, Product.id), False),
+    ProductSort.PRICE_DESC: ((Product.price, Product.id), True),
+    ProductSort.NEWEST: ((Product.id,), True),
+}
 
 
 class ProductService:
     @staticmethod
-    async def get_all(
+    def parse_cursor(cursor: str, sort: ProductSort) -> list:
+        """Decode a GET /products cursor for the given sort mode."""
+        if sort == ProductSort.DEFAULT:
+            return decode_cursor(cursor, (int, str, int))
+        if sort == ProductSort.NEWEST:
+            return decode_cursor(cursor, (int,))
+
+        price, product_id = decode_cursor(cursor, (str, int))
+        try:
+            return [Decimal(price), product_id]
+        except InvalidOperation:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    async def get_page(
         session: AsyncSession,
+        limit: int,
+        after: list | None = None,
         category_id: int | None = None,
-        only_active: bool = True
-    ) -> list[Product]:
-        query = select(Product).options(selectinload(Product.category))
+        only_active: bool = True,
+        include_descendants: bool = False,
+        min_price: Decimal | None = None,
+        max_price: Decimal | None = None,
+        sort: ProductSort = ProductSort.DEFAULT
+    ) -> tuple[list[Product], str | None]:
+        """
+        Keyset page of products in the given sort mode.
+
+        `after` holds the decoded keyset of the last row of the previous page
+        (see parse_cursor). With include_descendants, products of every
+        subcategory of category_id are included as well.
+        Returns products and the cursor of the next page (None on the last page).
+        Not cached here: GET /products caches the encoded page instead.
+        """
+        # Default order is served by idx_products_category_active_order,
+        # price orders by the partial (category_id, price, id) / (price, id) indexes
+        query = select(Product).options(joinedload(Product.category, innerjoin=True))
 
         if only_active:
             query = query.where(Product.is_active == True)
 
         if category_id is not None:
-            query = query.where(Product.category_id == category_id)
+            category_condition = await ProductService._category_condition(
+                session, category_id, include_descendants
+            )
+            if category_condition is None:
+                return [], None
+            query = query.where(category_condition)
+
+        if min_price is not None:
+            query = query.where(Product.price >= min_price)
+        if max_price is not None:
+            query = query.where(Product.price <= max_price)
+
+        key_columns, descending = _SORT_KEYS[sort]
+        if after is not None:
+            key, last = tuple_(*key_columns), tuple_(*after)
+            query = query.where(key < last if descending else key > last)
 
-        query = query.order_by(Product.sort_order, Product.name)
+        # Fetch one extra row to know whether another page exists
+        order_by = [c.desc() if descending else c for c in key_columns]
+        query = query.order_by(*order_by).limit(limit + 1)
 
         result = await session.execute(query)
-        return list(result.scalars().all())
+        products = list(result.scalars().all())
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            last_product = products[-1]
+            next_cursor = encode_cursor([getattr(last_product, c.key) for c in key_columns])
+
+        return products, next_cursor
+
+    @staticmethod
+    async def get_facets(
+        session: AsyncSession,
+        category_id: int | None = None,
+        include_descendants: bool = False,
+        min_price: Decimal | None = None,
+        max_price: Decimal | None = None
+    ) -> ProductFacets:
+        """
+        Facet counts for active products in scope, computed in one statement.
+
+        Category facet: products per child category of category_id (per root
+        category without it), respecting the price range. Products attached to
+        category_id itself are counted under category_id.
+        Price facet: products per PRICE_BUCKET_BOUNDS bucket, ignoring the
+        price range so the client can show how many items other ranges hold.
+        """
+        scope = Product.is_active == True
+        prefix = "/"
+        if category_id is not None:
+            prefix = await ProductService._get_category_path(session, category_id)
+            if prefix is None:
+                return ProductFacets(total=0, categories=[], price_buckets=[])
+            scope = and_(scope, await ProductService._category_condition(
+                session, category_id, include_descendants, path=prefix
+            ))
+
+        bucket = func.width_bucket(
+            Product.price,
+            literal_column(f"ARRAY[{', '.join(map(str, PRICE_BUCKET_BOUNDS))}]::numeric[]")
+        )
+
+        in_range = true()
+        if min_price is not None:
+            in_range = and_(in_range, Product.price >= min_price)
+        if max_price is not None:
+            in_range = and_(in_range, Product.price <= max_price)
+
+        # Collapse products to (category, bucket) counts first (index-only scan
+        # of the partial (category_id, price) index), then roll the few
+        # resulting rows up with GROUPING SETS
+        counts = (
+            select(
+                Product.category_id,
+                bucket.label("bucket"),
+                func.count().filter(in_range).label("in_range"),
+                func.count().label("total")
+            )
+            .where(scope)
+            .group_by(Product.category_id, bucket)
+            .subquery()
+        )
+
+        # First path segment below the prefix: the child category holding the product
+        child = func.split_part(func.substr(Category.path, len(prefix) + 1), "/", 1)
+
+        query = (
+            select(
+                child.label("child"),
+                counts.c.bucket,
+                func.sum(counts.c.in_range).label("in_range"),
+                func.sum(counts.c.total).label("total"),
+                # 1: per-child rows, 2: per-bucket rows, 3: grand total
+                func.grouping(child, counts.c.bucket).label("grouping")
+            )
+            .select_from(counts)
+            .join(Category, Category.id == counts.c.category_id)
+            .group_by(func.grouping_sets(child, counts.c.bucket, tuple_()))
+        )
+
+        result = await session.execute(query)
+
+        total = 0
+        categories = []
+        price_buckets = []
+        for row in result.all():
+            if row.grouping == 3:
+                total = int(row.in_range or 0)
+            elif row.grouping == 1:
+                if row.in_range:
+                    categories.append(CategoryFacet(
+                        category_id=int(row.child) if row.child else category_id,
+                        count=int(row.in_range)
+                    ))
+            else:
+                lower = PRICE_BUCKET_BOUNDS[row.bucket - 1] if row.bucket > 0 else None
+                upper = PRICE_BUCKET_BOUNDS[row.bucket] if row.bucket < len(PRICE_BUCKET_BOUNDS) else None
+                price_buckets.append(PriceBucketFacet(min_price=lower, max_price=upper, count=int(row.total)))
+
+        categories.sort(key=lambda f: f.category_id)
+        price_buckets.sort(key=lambda f: f.min_price or 0)
+        return ProductFacets(total=total, categories=categories, price_buckets=price_buckets)
+
+    @staticmethod
+    async def _category_condition(
+        session: AsyncSession,
+        category_id: int,
+        include_descendants: bool,
+        path: str | None = None
+    ):
+        """WHERE condition selecting products of a category (or its whole subtree)."""
+        if not include_descendants:
+            return Product.category_id == category_id
+
+        if path is None:
+            path = await ProductService._get_category_path(session, category_id)
+        if path is None:
+            return None
+        # One join against the materialized path; the prefix is rendered
+        # inline so the planner can use idx_categories_path (text_pattern_ops)
+        subtree = (
+            select(Category.id)
+            .where(Category.path.like(literal(path + "%", literal_execute=True)))
+        )
+        return Product.category_id.in_(subtree)
+
+    @staticmethod
+    async def search(
+        session: AsyncSession,
+        q: str,
+        limit: int,
+        after: list | None = None
+    ) -> tuple[list[Product], str | None]:
+        """
+        Search active products, best matches first.
+
+        Uses full-text search over name and description (Russian configuration,
+        ranked by ts_rank). When it finds nothing, falls back to trigram
+        similarity on the name to tolerate typos.
+        `after` is the decoded cursor [mode, score, id] of the previous page.
+        Returns products and the cursor of the next page (None on the last page).
+        """
+        mode = after[0] if after else None
+
+        if mode in (None, "fts"):
+            ts_query = func.websearch_to_tsquery("russian", q)
+            products, next_cursor = await ProductService._search_page(
+                session,
+                mode="fts",
+                score=func.ts_rank(Product.search_vector, ts_query),
+                condition=Product.search_vector.op("@@")(ts_query),
+                limit=limit,
+                after=after
+            )
+            if products or mode == "fts":
+                return products, next_cursor
+
+        # `%` is the pg_trgm similarity operator, served by idx_products_name_trgm
+        return await ProductService._search_page(
+            session,
+            mode="trgm",
+            score=func.similarity(Product.name, q),
+            condition=Product.name.op("%")(q),
+            limit=limit,
+            after=after
+        )
+
+    @staticmethod
+    async def _search_page(
+        session: AsyncSession,
+        mode: str,
+        score,
+        condition,
+        limit: int,
+        after: list | None
+    ) -> tuple[list[Product], str | None]:
+        score = score.label("score")
+        query = (
+            select(Product, score)
+            .options(joinedload(Product.category, innerjoin=True))
+            .where(Product.is_active == True, condition)
+        )
+
+        # Keyset on (score DESC, id ASC)
+        if after is not None:
+            _, last_score, last_id = after
+            query = query.where(or_(
+                score < last_score,
+                and_(score == last_score, Product.id > last_id)
+            ))
+
+        query = query.order_by(score.desc(), Product.id).limit(limit + 1)
+
+        result = await session.execute(query)
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_product, last_score = rows[-1]
+            next_cursor = encode_cursor([mode, float(last_score), last_product.id])
+
+        return [product for product, _ in rows], next_cursor
+
+    @staticmethod
+    async def _get_category_path(session: AsyncSession, category_id: int) -> str | None:
+        result = await session.execute(
+            select(Category.path).where(Category.id == category_id)
+        )
+        return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_id(session: AsyncSession, product_id: int) -> Product | None:
+        return await catalog_cache.get_or_load(
+            session,
+            ("product", product_id),
+            lambda: ProductService._load_by_id(session, product_id)
+        )
+
+    @staticmethod
+    async def _load_by_id(session: AsyncSession, product_id: int) -> Product | None:
         result = await session.execute(
             select(Product)
-            .options(selectinload(Product.category))
+            .options(joinedload(Product.category, innerjoin=True))
             .where(Product.id == product_id)
         )
         return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_ids(session: AsyncSession, product_ids: list[int]) -> list[Product]:
+        # Not cached: order creation must see current prices and availability
         result = await session.execute(
             select(Product).where(Product.id.in_(product_ids))
         )
@@ -1,49 +1,268 @@
+import asyncio
 import html
 import logging
+import math
+import re
+import time
 import httpx
 from decimal import Decimal
+from typing import NamedTuple
 
 from app.config import settings
+from app.core.metrics import TELEGRAM_SEND_DURATION, TELEGRAM_SEND_FAILURES
 from app.models.order import Order
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Bot API hard limit for a message text
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+_HTML_TAG = re.compile(r"<[^>]*>")
+
+
+def message_length(text: str) -> int:
+    """Length as Telegram checks it against the limit: of the parsed HTML, in UTF-16 code units."""
+    return len(html.unescape(_HTML_TAG.sub("", text)).encode("utf-16-le")) // 2
+
+
+class TelegramAPIError(Exception):
+    """Failed Bot API call. `retry_after` is set when Telegram asks to back off (429)."""
+
+    def __init__(self, message: str, status_code: int | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def is_permanent(self) -> bool:
+        """Client errors other than 429 (bad chat id, blocked bot, bad markup) won't succeed on retry."""
+        return self.status_code is not None and 400 <= self.status_code < 500 and self.status_code != 429
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity` (the allowed burst)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    def delay(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` are available."""
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def consume(self, tokens: float = 1) -> None:
+        self._tokens = self.tokens - tokens
+
+    def block(self, seconds: float) -> None:
+        """Hand out nothing for `seconds` (Telegram told us to back off)."""
+        self._tokens = min(self.tokens, -seconds * self.rate)
+
+
+class DispatchResult(NamedTuple):
+    sent: int  # leading texts delivered
+    failed: int  # texts right after those, in the message that raised `error`
+    error: TelegramAPIError | None
+    retry_in: float  # seconds until the remaining texts may be sent
+
+
+class NotificationScheduler:
+    """
+    Keeps sends under Telegram's flood limits with one token bucket per chat
+    and one for the whole bot.
+
+    When a chat has more queued texts than tokens, the texts are merged into
+    digests of up to TELEGRAM_MESSAGE_LIMIT characters, so a burst of orders
+    costs a handful of API calls instead of being throttled. Buckets live in
+    process memory: run one sender process, or split the limits between them.
+    """
+
+    def __init__(self, chat_rate: float, chat_burst: float, global_rate: float, global_burst: float):
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._global = TokenBucket(global_rate, global_burst)
+        self._chats: dict[int, TokenBucket] = {}
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self._chat_rate, self._chat_burst)
+        return bucket
+
+    def _delay(self, chat_id: int) -> float:
+        return max(self._chat_bucket(chat_id).delay(), self._global.delay())
+
+    def _consume(self, chat_id: int) -> None:
+        self._chat_bucket(chat_id).consume()
+        self._global.consume()
+
+    async def acquire(self, chat_id: int) -> None:
+        """Wait until one message to `chat_id` is allowed and take it."""
+        while (delay := self._delay(chat_id)) > 0:
+            await asyncio.sleep(delay)
+        self._consume(chat_id)
+
+    async def dispatch(self, chat_id: int, texts: list[str]) -> DispatchResult:
+        """
+        Send as many of `texts` (in order) as the limits allow right now.
+        Never waits: whatever does not fit is left for the caller to retry
+        after `retry_in` seconds.
+        """
+        available = math.floor(min(self._chat_bucket(chat_id).tokens, self._global.tokens))
+        if len(texts) <= available:
+            chunks = [[text] for text in texts]
+        else:
+            chunks = pack_digests(texts)
+
+        sent = 0
+        for chunk in chunks:
+            if self._delay(chat_id) > 0:
+                break
+            self._consume(chat_id)
+            try:
+                await TelegramBotService.deliver_message(chat_id, format_digest(chunk))
+            except TelegramAPIError as e:
+                if e.retry_after is not None:
+                    self._chat_bucket(chat_id).block(e.retry_after)
+                    self._global.block(e.retry_after)
+                    return DispatchResult(sent, len(chunk), e, e.retry_after)
+                return DispatchResult(sent, len(chunk), e, 0.0)
+            sent += len(chunk)
+
+        return DispatchResult(sent, 0, None, self._delay(chat_id) if sent < len(texts) else 0.0)
+
+
+def format_digest(texts: list[str]) -> str:
+    """One text as is, several under a counter header."""
+    if len(texts) == 1:
+        return texts[0]
+    return f"📦 <b>Новых заказов: {len(texts)}</b>" + DIGEST_SEPARATOR + DIGEST_SEPARATOR.join(texts)
+
+
+def pack_digests(texts: list[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[list[str]]:
+    """
+    Greedily group consecutive texts so each formatted digest fits in
+    `limit` characters. A text that alone exceeds it still gets a chunk of
+    its own; order texts never do (format_new_order shortens them).
+    """
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    for text in texts:
+        if current and message_length(format_digest(current + [text])) > limit:
+            chunks.append(current)
+            current = []
+        current.append(text)
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 class TelegramBotService:
-    BASE_URL = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}"
+    BASE_URL = f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}"
+
+    # One pooled keep-alive client per process, owned by the app lifespan
+    _client: httpx.AsyncClient | None = None
 
     @staticmethod
-    async def send_message(chat_id: int, text: str, parse_mode: str = "HTML") -> bool:
-        """Send message to Telegram chat."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{TelegramBotService.BASE_URL}/sendMessage",
-                    json={
-                        "chat_id": chat_id,
-                        "text": text,
-                        "parse_mode": parse_mode
-                    },
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return True
-            except Exception as e:
-                # Log error but don't fail the order creation
-                logger.error(
-                    "Failed to send Telegram message",
-                    exc_info=True,
-                    extra={"chat_id": chat_id, "error": str(e)}
+    def get_client() -> httpx.AsyncClient:
+        """Shared client; created on first use so scripts and workers need no setup."""
+        if TelegramBotService._client is None or TelegramBotService._client.is_closed:
+            TelegramBotService._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(
+                    settings.TELEGRAM_TIMEOUT,
+                    connect=settings.TELEGRAM_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.TELEGRAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.TELEGRAM_MAX_KEEPALIVE_CONNECTIONS
                 )
-                return False
+            )
+        return TelegramBotService._client
+
+    @staticmethod
+    async def close() -> None:
+        """Close the shared client and its pooled connections."""
+        if TelegramBotService._client is not None:
+            await TelegramBotService._client.aclose()
+            TelegramBotService._client = None
 
     @staticmethod
-    async def notify_new_order(order: Order) -> bool:
-        """Send notification to manager about new order."""
-        items_text = "\n".join([
+    async def deliver_message(chat_id: int, text: str, parse_mode: str = "HTML") -> None:
+        """Send message to Telegram chat. Raises TelegramAPIError on any failure."""
+        started = time.perf_counter()
+        try:
+            response = await TelegramBotService.get_client().post(
+                f"{TelegramBotService.BASE_URL}/sendMessage",
+                json={
+                    "chat_id": chat_id,
+                    "text": text,
+                    "parse_mode": parse_mode
+                }
+            )
+        except httpx.HTTPError as e:
+            TELEGRAM_SEND_FAILURES.labels("network").inc()
+            raise TelegramAPIError(f"{type(e).__name__}: {e}") from e
+        finally:
+            TELEGRAM_SEND_DURATION.observe(time.perf_counter() - started)
+
+        if response.is_success:
+            return
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        retry_after = body.get("parameters", {}).get("retry_after")
+        TELEGRAM_SEND_FAILURES.labels("rate_limited" if retry_after is not None else "api_error").inc()
+        raise TelegramAPIError(
+            body.get("description") or f"HTTP {response.status_code}",
+            status_code=response.status_code,
+            retry_after=float(retry_after) if retry_after is not None else None
+        )
+
+    @staticmethod
+    async def send_message(chat_id: int, text: str, parse_mode: str = "HTML") -> bool:
+        """Send message to Telegram chat, waiting for the rate limit. Returns False instead of raising."""
+        try:
+            await notification_scheduler.acquire(chat_id)
+            await TelegramBotService.deliver_message(chat_id, text, parse_mode)
+            return True
+        except TelegramAPIError as e:
+            logger.error(
+                "Failed to send Telegram message",
+                exc_info=True,
+                extra={"chat_id": chat_id, "error": str(e)}
+            )
+            return False
+
+    @staticmethod
+    def format_new_order(order: Order) -> str:
+        """
+        Manager notification text for a new order. Needs order.items loaded.
+        Always fits in one message: when the item list would not, the items
+        that fit are listed and the rest are counted.
+        """
+        item_lines = [
             f"• {html.escape(item.product_name)} × {item.quantity} = {item.price * item.quantity} ₽"
             for item in order.items
-        ])
+        ]
 
         delivery_info = ""
         if order.delivery_address:
@@ -53,7 +272,8 @@ class TelegramBotService:
         if order.comment:
             delivery_info += f"\n💬 <b>Комментарий:</b> {html.escape(order.comment)}"
 
-        message = f"""
+        def render(items_text: str) -> str:
+            return f"""
 🛒 <b>Новый заказ #{order.id}</b>
 
 👤 <b>Покупатель:</b> <a href="tg://user?id={order.user_id}">ID {order.user_id}</a>
@@ -65,9 +285,26 @@ class TelegramBotService:
 {delivery_info}
 
 🕐 <b>Создан:</b> {order.created_at.strftime('%d.%m.%Y %H:%M')}
-        """.strip()
+            """.strip()
 
-        return await TelegramBotService.send_message(
-            chat_id=settings.MANAGER_CHAT_ID,
-            text=message
-        )
+        text = render("\n".join(item_lines))
+        if message_length(text) <= TELEGRAM_MESSAGE_LIMIT:
+            return text
+
+        # Room left for item lines next to the longest possible "more items" line
+        budget = TELEGRAM_MESSAGE_LIMIT - message_length(render(f"… и ещё {len(item_lines)} поз."))
+        shown = 0
+        for line in item_lines:
+            budget -= message_length(line) + 1
+            if budget < 0:
+                break
+            shown += 1
+        return render("\n".join(item_lines[:shown] + [f"… и ещё {len(item_lines) - shown} поз."]))
+
+
+notification_scheduler = NotificationScheduler(
+    chat_rate=settings.TELEGRAM_CHAT_MESSAGES_PER_MINUTE / 60,
+    chat_burst=settings.TELEGRAM_CHAT_BURST,
+    global_rate=settings.TELEGRAM_GLOBAL_MESSAGES_PER_SECOND,
+    global_burst=settings.TELEGRAM_GLOBAL_MESSAGES_PER_SECOND
+)
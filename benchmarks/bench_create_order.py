@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for OrderService.create_order.
+
+Compares the previous flow (product SELECT, ORM inserts, commit, refresh)
+with the current one (product SELECT + one CTE insert with RETURNING) and
+counts statements per order. Orders are created for a dedicated user id
+and deleted afterwards. Requires migrations and at least three active
+products.
+
+Usage:
+    python -m benchmarks.bench_create_order [orders] [concurrency]
+"""
+import asyncio
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy import delete, event, select
+
+from app.database import async_session_maker, engine
+from app.models import Order, OrderItem, OutboxMessage, Product
+from app.models.enums import OrderStatus
+from app.schemas.order import OrderCreate
+from app.services.order_service import OrderService
+from app.services.outbox_service import ORDER_CREATED
+from app.services.product_service import ProductService
+
+BENCH_USER_ID = 999_000_001
+
+
+async def create_order_previous(session, user_id: int, order_data: OrderCreate) -> Order:
+    """The flow before the CTE insert, without validation."""
+    products = await ProductService.get_by_ids(session, [item.product_id for item in order_data.items])
+    products_dict = {p.id: p for p in products}
+
+    items = [
+        OrderItem(
+            product_id=item.product_id,
+            product_name=products_dict[item.product_id].name,
+            quantity=item.quantity,
+            price=products_dict[item.product_id].price
+        )
+        for item in order_data.items
+    ]
+    order = Order(
+        user_id=user_id,
+        status=OrderStatus.PENDING,
+        total_amount=sum((i.price * i.quantity for i in items), Decimal("0")),
+        phone=order_data.phone,
+        items=items
+    )
+    session.add(order)
+    session.add(OutboxMessage(kind=ORDER_CREATED, order=order))
+    await session.commit()
+    await session.refresh(order, ["items"])
+    return order
+
+
+async def run(label: str, create, order_data: OrderCreate, orders: int, concurrency: int) -> None:
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore, async_session_maker() as session:
+            await create(session, BENCH_USER_ID, order_data)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(orders)))
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    print(f"{label:<10} {orders / elapsed:8.1f} orders/s   {statements / orders:4.1f} statements/order")
+
+
+async def cleanup() -> None:
+    async with async_session_maker() as session:
+        order_ids = select(Order.id).where(Order.user_id == BENCH_USER_ID)
+        await session.execute(delete(OutboxMessage).where(OutboxMessage.order_id.in_(order_ids)))
+        await session.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        await session.execute(delete(Order).where(Order.user_id == BENCH_USER_ID))
+        await session.commit()
+
+
+async def main() -> None:
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    async with async_session_maker() as session:
+        result = await session.execute(select(Product.id).where(Product.is_active == True).limit(3))
+        product_ids = list(result.scalars().all())
+    if len(product_ids) < 3:
+        sys.exit("Need at least three active products")
+
+    order_data = OrderCreate(
+        items=[{"product_id": product_id, "quantity": 2} for product_id in product_ids],
+        phone="+70000000000"
+    )
+
+    print(f"{orders} orders, 3 items each, concurrency {concurrency}")
+    try:
+        # Warm up the pool and prepared statement caches
+        await run("warmup", OrderService.create_order, order_data, concurrency, concurrency)
+        await run("previous", create_order_previous, order_data, orders, concurrency)
+        await run("current", OrderService.create_order, order_data, orders, concurrency)
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
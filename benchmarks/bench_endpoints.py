@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Latency, query and allocation benchmark for every /api/v1 endpoint.
+
+Drives the app in-process through httpx's ASGI transport, signed in as the
+seeded benchmark user with valid initData, so no server or Telegram is
+involved. For each scenario it reports p50/p99 latency, SQL statements and
+DB time per request (app.core.profiling) and the peak memory allocated
+while handling one request (tracemalloc, measured in a separate pass so
+tracing does not skew latencies). Results are written as JSON; pass an
+earlier file with --compare to print the change per scenario.
+
+Seed the database first (python -m benchmarks.seed_catalog). POST /orders
+scenarios create real orders for the benchmark user.
+
+Usage:
+    python -m benchmarks.bench_endpoints [--requests 200] [--warmup 20]
+                                         [--only products] [--cold-cache]
+                                         [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import func, make_url, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.main import app
+from app.core.profiling import count_queries
+from app.models import Category, Order, Product
+from app.services.catalog_cache import catalog_cache
+from benchmarks.bench_auth import sign_init_data
+from benchmarks.seed_catalog import BENCH_USER_ID
+
+# A change beyond this share of the baseline is flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+ALLOCATION_SAMPLES = 20
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    url: str
+    body: dict | None = None
+    headers: dict = field(default_factory=dict)
+    # Fresh Idempotency-Key per request
+    new_idempotency_key: bool = False
+
+
+async def build_scenarios() -> list[Scenario]:
+    """Every /api/v1 route with ids picked from the seeded data."""
+    async with async_session_maker() as session:
+        root_id = await session.scalar(
+            select(Category.id).where(Category.parent_id.is_(None)).order_by(Category.id).limit(1)
+        )
+        leaf_id = await session.scalar(
+            select(Product.category_id).where(Product.is_active == True).order_by(Product.id).limit(1)
+        )
+        product_ids = list(await session.scalars(
+            select(Product.id).where(Product.is_active == True).order_by(Product.id).limit(3)
+        ))
+        order_id = await session.scalar(
+            select(func.max(Order.id)).where(Order.user_id == BENCH_USER_ID)
+        )
+
+    if root_id is None or len(product_ids) < 3:
+        raise SystemExit("No catalog found; run python -m benchmarks.seed_catalog first")
+
+    # Second catalog page: the cursor comes from the first one
+    async with client() as http:
+        first_page = await http.get("/api/v1/products", headers=auth_headers())
+    next_cursor = first_page.headers.get("x-next-cursor", "")
+
+    order_body = {
+        "items": [{"product_id": product_id, "quantity": 1} for product_id in product_ids],
+        "phone": "+79990000000",
+        "delivery_address": "ул. Тестовая, 1"
+    }
+    replay_key = str(uuid.uuid4())
+
+    scenarios = [
+        Scenario("users.me", "GET", "/api/v1/users/me"),
+        Scenario("categories.list", "GET", "/api/v1/categories"),
+        Scenario("categories.list_children", "GET", "/api/v1/categories?include_children=true"),
+        Scenario("categories.tree", "GET", "/api/v1/categories/tree"),
+        Scenario("categories.get", "GET", f"/api/v1/categories/{root_id}"),
+        Scenario("products.page", "GET", "/api/v1/products"),
+        Scenario("products.page_2", "GET", f"/api/v1/products?cursor={next_cursor}"),
+        Scenario("products.category", "GET", f"/api/v1/products?category_id={leaf_id}"),
+        Scenario("products.subtree", "GET", f"/api/v1/products?category_id={root_id}&include_descendants=true"),
+        Scenario("products.price_filter", "GET", "/api/v1/products?min_price=500&max_price=1500&sort=price_asc"),
+        Scenario("products.facets", "GET", f"/api/v1/products?category_id={root_id}&include_descendants=true&include_facets=true"),
+        Scenario("products.max_page", "GET", "/api/v1/products?limit=500"),
+        Scenario("products.search", "GET", "/api/v1/products/search?q=шоколад"),
+        Scenario("products.search_typo", "GET", "/api/v1/products/search?q=шоколат"),
+        Scenario("products.get", "GET", f"/api/v1/products/{product_ids[0]}"),
+        Scenario("orders.my", "GET", "/api/v1/orders/my"),
+        Scenario("orders.my_summary", "GET", "/api/v1/orders/my?summary=true"),
+        Scenario("orders.create", "POST", "/api/v1/orders", body=order_body),
+        Scenario("orders.create_idempotent", "POST", "/api/v1/orders", body=order_body, new_idempotency_key=True),
+        Scenario("orders.replay", "POST", "/api/v1/orders", body=order_body, headers={"Idempotency-Key": replay_key}),
+    ]
+    if order_id is not None:
+        scenarios.append(Scenario("orders.get", "GET", f"/api/v1/orders/{order_id}"))
+    return scenarios
+
+
+def auth_headers() -> dict:
+    init_data = sign_init_data({"id": BENCH_USER_ID, "first_name": "Bench"}, settings.TELEGRAM_BOT_TOKEN)
+    return {"Authorization": f"tma {init_data}", "Accept-Encoding": "br, gzip"}
+
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def send(http: httpx.AsyncClient, scenario: Scenario, headers: dict) -> httpx.Response:
+    headers = {**headers, **scenario.headers}
+    if scenario.new_idempotency_key:
+        headers["Idempotency-Key"] = str(uuid.uuid4())
+    return await http.request(scenario.method, scenario.url, json=scenario.body, headers=headers)
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def run_scenario(http: httpx.AsyncClient, scenario: Scenario, args: argparse.Namespace) -> dict:
+    headers = auth_headers()
+    for _ in range(args.warmup):
+        await send(http, scenario, headers)
+
+    latencies, queries, db_time, statuses = [], [], [], set()
+    for _ in range(args.requests):
+        if args.cold_cache:
+            catalog_cache.clear()
+        with count_queries() as stats:
+            started = time.perf_counter()
+            response = await send(http, scenario, headers)
+            latencies.append(time.perf_counter() - started)
+        queries.append(stats.count)
+        db_time.append(stats.time)
+        statuses.add(response.status_code)
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min(args.requests, ALLOCATION_SAMPLES)):
+        if args.cold_cache:
+            catalog_cache.clear()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await send(http, scenario, headers)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        "method": scenario.method,
+        "url": scenario.url,
+        "status": sorted(statuses),
+        "requests": args.requests,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "queries_per_request": statistics.fmean(queries),
+        "db_ms_per_request": statistics.fmean(db_time) * 1000,
+        "peak_alloc_kb": statistics.median(peaks) / 1024,
+        "response_bytes": len(response.content),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+HEADER = f"{'scenario':<28} {'status':>8} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8} {'db ms':>7} {'alloc KB':>9}"
+
+
+def print_result(name: str, result: dict, previous: dict | None) -> None:
+    status = ",".join(str(code) for code in result["status"])
+    print(
+        f"{name:<28} {status:>8} {result['p50_ms']:9.2f} {result['p99_ms']:9.2f} "
+        f"{result['queries_per_request']:8.2f} {result['db_ms_per_request']:7.2f} {result['peak_alloc_kb']:9.1f}",
+        flush=True
+    )
+    if previous:
+        changes = []
+        for metric in ("p50_ms", "p99_ms", "queries_per_request", "peak_alloc_kb"):
+            before, after = previous[metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            flag = " !" if change > REGRESSION_THRESHOLD else ""
+            changes.append(f"{metric} {change:+.0%}{flag}")
+        print(f"{'':<28} vs baseline: " + ", ".join(changes), flush=True)
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Slow-query warnings would repeat for every measured request
+    logging.getLogger("app.core.profiling").setLevel(logging.ERROR)
+
+    scenarios = await build_scenarios()
+    if args.only:
+        scenarios = [s for s in scenarios if any(s.name.startswith(prefix) for prefix in args.only)]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print(HEADER)
+    async with client() as http:
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(http, scenario, args)
+            print_result(scenario.name, results[scenario.name], baseline.get(scenario.name))
+
+    report = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "database": make_url(settings.DATABASE_URL).database,
+        "options": {"requests": args.requests, "warmup": args.warmup, "cold_cache": args.cold_cache},
+        "results": results,
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Results written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes, e.g. products orders.my")
+    parser.add_argument("--cold-cache", action="store_true", help="clear the catalog cache before every request")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
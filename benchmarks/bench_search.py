@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for ProductService.search on a seeded catalog.
+
+Seeds N synthetic products inside a transaction, runs full-text and typo
+(trigram fallback) queries against them and rolls everything back, so the
+target database is left untouched. Requires migrations to be applied.
+
+Usage:
+    python -m benchmarks.bench_search [products] [queries_per_term]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from app.database import async_session_maker
+from app.services.product_service import ProductService
+
+WORDS = [
+    "шоколад", "мармелад", "печенье", "чай", "кофе", "зелёный", "чёрный",
+    "сладкий", "ароматный", "классический", "мятный", "лимонный", "ягодный",
+    "ванильный", "карамель", "орех", "мёд", "имбирь", "корица", "апельсин",
+]
+
+SEED_SQL = """
+    INSERT INTO products (name, description, price, images, category_id, is_active, sort_order)
+    SELECT
+        initcap(w1) || ' ' || w2 || ' ' || g,
+        'Описание: ' || w2 || ', ' || w3 || ' и ' || w1,
+        (100 + random() * 9900)::numeric(10, 2),
+        '[]'::json,
+        :category_id,
+        true,
+        g % 100
+    FROM generate_series(1, :count) AS g,
+    LATERAL (
+        SELECT
+            (CAST(:words AS text[]))[1 + (g * 7) % :n] AS w1,
+            (CAST(:words AS text[]))[1 + (g * 13) % :n] AS w2,
+            (CAST(:words AS text[]))[1 + (g * 31) % :n] AS w3
+    ) AS w
+"""
+
+SEARCH_TERMS = ["шоколад", "ароматный чай", "мятный мармелад", "шоколат", "корецы"]
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    async with async_session_maker() as session:
+        category_id = (await session.execute(text(
+            "INSERT INTO categories (name, slug, sort_order) "
+            "VALUES ('Benchmark', 'bench-search-tmp', 0) RETURNING id"
+        ))).scalar_one()
+
+        started = time.perf_counter()
+        await session.execute(
+            text(SEED_SQL),
+            {"category_id": category_id, "count": count, "words": WORDS, "n": len(WORDS)}
+        )
+        await session.execute(text("ANALYZE products"))
+        print(f"seeded {count} products in {time.perf_counter() - started:.1f}s")
+
+        for term in SEARCH_TERMS:
+            timings = []
+            products = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                products, _ = await ProductService.search(session, q=term, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(
+                f"{term!r:<22} hits={len(products):<3} "
+                f"p50={statistics.median(timings):7.2f} ms  p99={p99:7.2f} ms"
+            )
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
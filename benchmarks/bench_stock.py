@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Concurrent checkout load test for stock reservation.
+
+Creates a few hot SKUs with limited stock, fires many concurrent
+OrderService.create_order calls at them, then checks that nothing was
+oversold (units in orders == units taken off stock, stock never negative)
+and reports orders per second. Cancelling every order afterwards must
+return the stock to its starting value. Everything created is deleted.
+Requires migrations and at least one category.
+
+Usage:
+    python -m benchmarks.bench_stock [attempts] [concurrency] [skus] [stock_per_sku]
+"""
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from app.database import async_session_maker, engine
+from app.models import Category, Order, OrderItem, OutboxMessage, Product
+from app.models.enums import OrderStatus
+from app.schemas.order import OrderCreate
+from app.services.order_service import OrderService
+
+BENCH_USER_ID = 999_000_002
+
+
+async def create_skus(count: int, stock: int) -> list[int]:
+    async with async_session_maker() as session:
+        category_id = (await session.execute(select(Category.id).limit(1))).scalar_one()
+        products = [
+            Product(name=f"Bench hot SKU {i}", price=100, images=[], category_id=category_id, stock=stock)
+            for i in range(count)
+        ]
+        session.add_all(products)
+        await session.commit()
+        return [p.id for p in products]
+
+
+async def stock_of(product_ids: list[int]) -> dict[int, int]:
+    async with async_session_maker() as session:
+        result = await session.execute(select(Product.id, Product.stock).where(Product.id.in_(product_ids)))
+        return dict(result.all())
+
+
+async def ordered_units(product_ids: list[int]) -> Counter:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .join(Order)
+            .where(Order.user_id == BENCH_USER_ID, Order.status != OrderStatus.CANCELLED)
+            .group_by(OrderItem.product_id)
+        )
+        return Counter(dict(result.all()))
+
+
+async def cleanup(product_ids: list[int]) -> None:
+    async with async_session_maker() as session:
+        order_ids = select(Order.id).where(Order.user_id == BENCH_USER_ID)
+        await session.execute(delete(OutboxMessage).where(OutboxMessage.order_id.in_(order_ids)))
+        await session.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        await session.execute(delete(Order).where(Order.user_id == BENCH_USER_ID))
+        await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+        await session.commit()
+
+
+async def main() -> None:
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    skus = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    stock = int(sys.argv[4]) if len(sys.argv) > 4 else 500
+
+    product_ids = await create_skus(skus, stock)
+    outcomes = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def checkout() -> None:
+        # Carts with one or two hot SKUs and 1-3 units each
+        cart = random.sample(product_ids, k=min(len(product_ids), random.randint(1, 2)))
+        order_data = OrderCreate(items=[{"product_id": i, "quantity": random.randint(1, 3)} for i in cart])
+        async with semaphore, async_session_maker() as session:
+            try:
+                await OrderService.create_order(session, BENCH_USER_ID, order_data)
+                outcomes["created"] += 1
+            except HTTPException as e:
+                outcomes[e.status_code] += 1
+
+    try:
+        print(f"{attempts} checkouts, concurrency {concurrency}, {skus} SKUs x {stock} units")
+        started = time.perf_counter()
+        await asyncio.gather(*(checkout() for _ in range(attempts)), return_exceptions=False)
+        elapsed = time.perf_counter() - started
+
+        left = await stock_of(product_ids)
+        sold = await ordered_units(product_ids)
+        print(f"{attempts / elapsed:8.1f} checkouts/s   {outcomes['created'] / elapsed:8.1f} orders/s   {dict(outcomes)}")
+        print(f"stock left {left}, units in orders {dict(sold)}")
+
+        oversold = [i for i in product_ids if left[i] < 0 or left[i] + sold[i] != stock]
+        print("no oversell" if not oversold else f"OVERSOLD: {oversold}")
+
+        async with async_session_maker() as session:
+            result = await session.execute(select(Order.id).where(Order.user_id == BENCH_USER_ID))
+            for order_id in result.scalars().all():
+                await OrderService.update_status(session, order_id, OrderStatus.CANCELLED)
+        restored = await stock_of(product_ids)
+        print("stock restored" if all(v == stock for v in restored.values()) else f"RESTORE MISMATCH: {restored}")
+    finally:
+        await cleanup(product_ids)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
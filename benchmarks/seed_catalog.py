@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Seed a synthetic catalog and order history for benchmarks.
+
+Builds a category tree of the given depth and fan-out, spreads products over
+its leaves and creates orders (1-3 items each) for a range of synthetic
+users. Benchmark user BENCH_USER_ID (the one bench_endpoints signs in as)
+gets --user-orders of them. Everything is generated by INSERT ... SELECT
+over generate_series; 100k products and 1M orders take about two minutes
+locally.
+
+Point DATABASE_URL at a dedicated database with migrations applied. Slugs
+and user ids are fixed, so seed into an empty database or pass --reset,
+which TRUNCATEs users, catalog and orders first.
+
+Usage:
+    python -m benchmarks.seed_catalog [--products 100000] [--depth 5] [--fanout 4]
+                                      [--orders 1000000] [--users 10000]
+                                      [--user-orders 500] [--reset]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.database import async_session_maker
+
+BENCH_USER_ID = 990_000_000
+
+# Seeded rows are recognisable by slug; synthetic user ids start at BENCH_USER_ID
+SLUG_PREFIX = "bench"
+
+WORDS = [
+    "шоколад", "мармелад", "печенье", "чай", "кофе", "зелёный", "чёрный",
+    "сладкий", "ароматный", "классический", "мятный", "лимонный", "ягодный",
+    "ванильный", "карамель", "орех", "мёд", "имбирь", "корица", "апельсин",
+]
+
+RESET_SQL = """
+    TRUNCATE users, order_items, outbox, idempotency_keys, orders, products, categories
+    RESTART IDENTITY CASCADE
+"""
+
+ROOT_CATEGORIES_SQL = """
+    INSERT INTO categories (name, slug, sort_order, parent_id, is_active, is_info_only, coming_soon)
+    SELECT 'Раздел ' || g, :slug_prefix || g, g, NULL, true, false, false
+    FROM generate_series(1, :fanout) AS g
+"""
+
+CHILD_CATEGORIES_SQL = """
+    INSERT INTO categories (name, slug, sort_order, parent_id, is_active, is_info_only, coming_soon)
+    SELECT p.name || '.' || g, :slug_prefix || p.id || '-' || g, g, p.id, true, false, false
+    FROM categories p, generate_series(1, :fanout) AS g
+    WHERE p.slug LIKE :parent_pattern
+"""
+
+PRODUCTS_SQL = """
+    INSERT INTO products (name, description, price, images, category_id, is_active, sort_order)
+    SELECT
+        initcap(w[1 + g % 20]) || ' ' || w[1 + (g / 20) % 20] || ' ' || g,
+        'Описание: ' || w[1 + (g / 7) % 20] || ', ' || w[1 + (g / 3) % 20] || ' и ' || w[1 + g % 20],
+        (100 + (g * 7919) % 9900)::numeric(10, 2),
+        json_build_array('/static/products/' || g || '.jpg'),
+        leaves.ids[1 + g % cardinality(leaves.ids)],
+        g % 50 <> 0,
+        g % 100
+    FROM generate_series(1, :count) AS g,
+    (SELECT array_agg(id ORDER BY id) AS ids FROM categories WHERE slug LIKE :leaf_pattern) AS leaves,
+    (SELECT CAST(:words AS text[]) AS w) AS words
+"""
+
+USERS_SQL = """
+    INSERT INTO users (telegram_id, username, first_name)
+    SELECT :first_user + g, 'bench' || g, 'Bench ' || g
+    FROM generate_series(0, :users - 1) AS g
+"""
+
+# The benchmark user gets the first :user_orders orders, the rest are spread
+# over the other synthetic users. Timestamps go back one minute per order.
+ORDERS_SQL = """
+    INSERT INTO orders (user_id, status, total_amount, delivery_address, phone, comment, created_at, updated_at)
+    SELECT
+        CASE WHEN g <= :user_orders THEN :first_user ELSE :first_user + 1 + g % (:users - 1) END,
+        (ARRAY['pending', 'confirmed', 'delivered', 'cancelled']::orderstatus[])[1 + g % 4],
+        0,
+        'ул. Тестовая, ' || g % 200,
+        '+7999' || lpad((g % 10000000)::text, 7, '0'),
+        NULL,
+        now() - g * interval '1 minute',
+        now() - g * interval '1 minute'
+    FROM generate_series(1, :orders) AS g
+"""
+
+ORDER_ITEMS_SQL = """
+    WITH catalog AS (
+        SELECT id, name, price, row_number() OVER (ORDER BY id) - 1 AS n FROM products
+    )
+    INSERT INTO order_items (order_id, product_id, product_name, quantity, price)
+    SELECT o.id, p.id, p.name, 1 + (o.id + line) % 3, p.price
+    FROM orders o
+    CROSS JOIN LATERAL generate_series(0, o.id % 3) AS line
+    JOIN catalog p ON p.n = (o.id * 31 + line * 7) % (SELECT count(*) FROM products)
+    WHERE o.user_id >= :first_user
+"""
+
+ORDER_TOTALS_SQL = """
+    UPDATE orders o SET total_amount = t.total
+    FROM (SELECT order_id, sum(price * quantity) AS total FROM order_items GROUP BY order_id) AS t
+    WHERE t.order_id = o.id AND o.user_id >= :first_user
+"""
+
+
+async def step(session, label: str, sql: str, **params) -> None:
+    started = time.perf_counter()
+    result = await session.execute(text(sql), params)
+    print(f"{label:<28} {result.rowcount:>10} rows  {time.perf_counter() - started:7.2f} s")
+
+
+async def seed(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        if args.reset:
+            await step(session, "truncate", RESET_SQL)
+
+        # Slugs are '<prefix>-<level>-...', so each level is found by a LIKE pattern
+        await step(
+            session, "categories level 1", ROOT_CATEGORIES_SQL,
+            slug_prefix=f"{SLUG_PREFIX}-1-", fanout=args.fanout
+        )
+        for level in range(2, args.depth + 1):
+            await step(
+                session, f"categories level {level}", CHILD_CATEGORIES_SQL,
+                slug_prefix=f"{SLUG_PREFIX}-{level}-", parent_pattern=f"{SLUG_PREFIX}-{level - 1}-%",
+                fanout=args.fanout
+            )
+
+        await step(
+            session, "products", PRODUCTS_SQL,
+            leaf_pattern=f"{SLUG_PREFIX}-{args.depth}-%", count=args.products, words=WORDS
+        )
+        await step(session, "users", USERS_SQL, first_user=BENCH_USER_ID, users=args.users)
+
+        if args.orders:
+            await step(
+                session, "orders", ORDERS_SQL,
+                first_user=BENCH_USER_ID, users=args.users, orders=args.orders, user_orders=args.user_orders
+            )
+            await step(session, "order items", ORDER_ITEMS_SQL, first_user=BENCH_USER_ID)
+            await step(session, "order totals", ORDER_TOTALS_SQL, first_user=BENCH_USER_ID)
+
+        await session.commit()
+
+        # Fresh statistics, or the planner benchmarks plans for empty tables
+        await step(session, "analyze", "ANALYZE")
+        await session.commit()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=5, help="levels of the category tree")
+    parser.add_argument("--fanout", type=int, default=4, help="children per category")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--user-orders", type=int, default=500, help="orders of the benchmark user")
+    parser.add_argument("--reset", action="store_true", help="TRUNCATE users, catalog and orders first")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(seed(parse_args()))
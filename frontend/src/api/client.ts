@@ -1,4 +1,4 @@
-import { Category, Product, OrderCreate, Order } from '../types';
+import { Category, Product, OrderCreate, Order, Page } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
 
@@ -8,10 +8,10 @@ export const setInitData = (initData: string) => {
   initDataGlobal = initData;
 };
 
-const apiClient = async <T>(
+const request = async (
   endpoint: string,
   options: RequestInit = {}
-): Promise<T> => {
+): Promise<Response> => {
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
     ...(initDataGlobal && { Authorization: `tma ${initDataGlobal}` }),
@@ -28,9 +28,33 @@ const apiClient = async <T>(
     throw new Error(error.detail || `HTTP ${response.status}`);
   }
 
+  return response;
+};
+
+const apiClient = async <T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T> => {
+  const response = await request(endpoint, options);
   return response.json();
 };
 
+// One page of a keyset-paginated list; pass nextCursor back to get the following one
+const fetchPage = async <T>(
+  endpoint: string,
+  params: URLSearchParams,
+  cursor?: string | null
+): Promise<Page<T>> => {
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  const response = await request(`${endpoint}?${params.toString()}`);
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+  };
+};
+
 export const api = {
   // Categories
   getCategories: (includeChildren = false): Promise<Category[]> => {
@@ -41,18 +65,22 @@ export const api = {
     return apiClient<Category[]>(`/categories?${params.toString()}`);
   },
 
-  getCategory: (id: number): Promise<Category> => {
-    return apiClient<Category>(`/categories/${id}`);
+  // Whole active hierarchy with nested children, in one request
+  getCategoryTree: (): Promise<Category[]> => {
+    return apiClient<Category[]>('/categories/tree');
   },
 
-  getCategoryChildren: (parentId: number): Promise<Category[]> => {
-    return apiClient<Category[]>(`/categories?parent_id=${parentId}`);
+  getCategory: (id: number): Promise<Category> => {
+    return apiClient<Category>(`/categories/${id}`);
   },
 
   // Products
-  getProducts: (categoryId?: number): Promise<Product[]> => {
-    const params = categoryId ? `?category_id=${categoryId}` : '';
-    return apiClient<Product[]>(`/products${params}`);
+  getProducts: (categoryId?: number, cursor?: string | null): Promise<Page<Product>> => {
+    const params = new URLSearchParams();
+    if (categoryId) {
+      params.append('category_id', String(categoryId));
+    }
+    return fetchPage<Product>('/products', params, cursor);
   },
 
   getProduct: (id: number): Promise<Product> => {
@@ -60,10 +88,11 @@ export const api = {
   },
 
   // Orders
-  createOrder: (data: OrderCreate): Promise<Order> => {
+  createOrder: (data: OrderCreate, idempotencyKey?: string): Promise<Order> => {
     return apiClient<Order>('/orders', {
       method: 'POST',
       body: JSON.stringify(data),
+      ...(idempotencyKey && { headers: { 'Idempotency-Key': idempotencyKey } }),
     });
   },
 };
@@ -46,12 +46,28 @@ const cardVariants = {
   },
 };
 
+// Depth-first search of the category tree
+const findCategory = (nodes: Category[], id: number): Category | null => {
+  for (const node of nodes) {
+    if (node.id === id) {
+      return node;
+    }
+    const found = findCategory(node.children ?? [], id);
+    if (found) {
+      return found;
+    }
+  }
+  return null;
+};
+
 export const CategoryPage = () => {
   const { id } = useParams<{ id: string }>();
   const navigate = useNavigate();
   const [category, setCategory] = useState<Category | null>(null);
   const [children, setChildren] = useState<Category[]>([]);
   const [products, setProducts] = useState<Product[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -70,15 +86,17 @@ export const CategoryPage = () => {
       setLoading(true);
       setError(null);
 
-      const [currentCategory, categoryChildren, categoryProducts] = await Promise.all([
-        api.getCategory(categoryId),
-        api.getCategoryChildren(categoryId),
+      // The tree is one cached request shared with the home page
+      const [tree, firstPage] = await Promise.all([
+        api.getCategoryTree(),
         api.getProducts(categoryId),
       ]);
 
+      const currentCategory = findCategory(tree, categoryId);
       setCategory(currentCategory);
-      setChildren(categoryChildren);
-      setProducts(categoryProducts);
+      setChildren(currentCategory?.children ?? []);
+      setProducts(firstPage.items);
+      setNextCursor(firstPage.nextCursor);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load category');
     } finally {
@@ -86,6 +104,23 @@ export const CategoryPage = () => {
     }
   };
 
+  // Products come one page at a time; the next one is requested by "Show more"
+  const loadMoreProducts = async () => {
+    if (!category || !nextCursor || loadingMore) {
+      return;
+    }
+    try {
+      setLoadingMore(true);
+      const page = await api.getProducts(category.id, nextCursor);
+      setProducts((loaded) => [...loaded, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Failed to load more products:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // NEW: Toggle accordion and load products for subcategory
   const toggleSubcategory = async (subcategoryId: number) => {
     // If clicking on already expanded, collapse it
@@ -100,8 +135,9 @@ export const CategoryPage = () => {
     // Load products if not already loaded
     if (!subcategoryProducts.has(subcategoryId)) {
       try {
-        const products = await api.getProducts(subcategoryId);
-        setSubcategoryProducts(new Map(subcategoryProducts).set(subcategoryId, products));
+        // The preview needs only the first page
+        const { items } = await api.getProducts(subcategoryId);
+        setSubcategoryProducts(new Map(subcategoryProducts).set(subcategoryId, items));
       } catch (err) {
         console.error('Failed to load subcategory products:', err);
       }
@@ -274,13 +310,13 @@ export const CategoryPage = () => {
                           </motion.div>
 
                           {/* Show More Button */}
-                          {childProducts.length > 2 && (
+                          {child.product_count > 2 && (
                             <motion.button
                               onClick={() => navigate(`/category/${child.id}`)}
                               whileTap={tapScale}
                               className="w-full py-2.5 text-green-600 font-semibold text-sm"
                             >
-                              Show all {childProducts.length} products →
+                              Show all {child.product_count} products →
                             </motion.button>
                           )}
                         </>
@@ -319,7 +355,7 @@ export const CategoryPage = () => {
       <Header title={category.name} showBack />
       <div className="bg-gradient-to-b from-green-50/40 via-white to-white min-h-screen">
         <motion.div
-          className="p-4 pb-24 grid grid-cols-2 gap-3"
+          className={`p-4 grid grid-cols-2 gap-3 ${nextCursor ? '' : 'pb-24'}`}
           variants={containerVariants}
           initial="hidden"
           animate="show"
@@ -371,6 +407,19 @@ export const CategoryPage = () => {
             </motion.div>
           ))}
         </motion.div>
+
+        {nextCursor && (
+          <div className="px-4 pb-24">
+            <motion.button
+              onClick={loadMoreProducts}
+              disabled={loadingMore}
+              whileTap={tapScale}
+              className="w-full py-3 text-green-600 font-semibold text-sm disabled:text-gray-400"
+            >
+              {loadingMore ? 'Loading...' : 'Show more'}
+            </motion.button>
+          </div>
+        )}
       </div>
     </>
   );
@@ -1,4 +1,4 @@
-import { useState, useEffect, FormEvent } from 'react';
+import { useState, useEffect, useRef, FormEvent } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Header } from '../components/Header';
 import { EmptyState } from '../components/EmptyState';
@@ -16,6 +16,10 @@ export const CheckoutPage = () => {
   const [phone, setPhone] = useState('');
   const [comment, setComment] = useState('');
 
+  // Retries of the same checkout reuse one Idempotency-Key, so a lost
+  // response never turns into a second order
+  const idempotency = useRef<{ body: string; key: string } | null>(null);
+
   useEffect(() => {
     const currentCart = getCart();
     if (currentCart.length === 0) {
@@ -46,7 +50,12 @@ export const CheckoutPage = () => {
         comment: comment || undefined,
       };
 
-      const order = await api.createOrder(orderData);
+      const body = JSON.stringify(orderData);
+      if (idempotency.current?.body !== body) {
+        idempotency.current = { body, key: crypto.randomUUID() };
+      }
+
+      const order = await api.createOrder(orderData, idempotency.current.key);
 
       // Clear cart
       clearCart();
@@ -41,7 +41,8 @@ export const HomePage = () => {
     try {
       setLoading(true);
       setError(null);
-      const data = await api.getCategories();
+      // Roots of the tree; CategoryPage reuses the same response for subcategories
+      const data = await api.getCategoryTree();
       setCategories(data);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load categories');
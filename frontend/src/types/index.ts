@@ -7,6 +7,8 @@ export interface Category {
   is_active: boolean;
   is_info_only: boolean;
   coming_soon: boolean;
+  product_count: number;
+  total_product_count: number;
   children?: Category[];
 }
 
@@ -22,6 +24,12 @@ export interface Product {
   category?: Category;
 }
 
+// One page of a keyset-paginated list; nextCursor is null on the last page
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
 export interface CartItem {
   product: Product;
   quantity: number;
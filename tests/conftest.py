@@ -0,0 +1,36 @@
+"""
+Shared fixtures. The tests talk to the database in DATABASE_URL, migrated
+to head and holding at least one active product (seed_test_products.sql).
+"""
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.database import async_session_maker, engine
+from app.main import app
+from app.models.product import Product
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # One event loop for the whole run: pooled asyncpg connections are bound to it
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client(anyio_backend):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def product_id(anyio_backend) -> int:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Product.id).where(Product.is_active == True).order_by(Product.id).limit(1)
+        )
+        product_id = result.scalar_one_or_none()
+    if product_id is None:
+        pytest.skip("no active products in the database")
+    return product_id
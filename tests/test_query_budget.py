@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.profiling import query_budget
+from app.services.catalog_cache import catalog_cache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_product_by_id_budget(client, product_id):
+    # Cold catalog cache: the catalog_version check and one product SELECT
+    # (category joined in). The ETag dependency reuses the checked version.
+    catalog_cache.clear()
+    with query_budget(2):
+        response = await client.get(f"/api/v1/products/{product_id}")
+    assert response.status_code == 200
+
+
+async def test_over_budget_fails(client, product_id):
+    catalog_cache.clear()
+    with pytest.raises(AssertionError, match=r"Expected 1 queries, got 2:\n  1x SELECT"):
+        with query_budget(1):
+            await client.get(f"/api/v1/products/{product_id}")